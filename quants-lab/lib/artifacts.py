@@ -8,6 +8,23 @@ from pathlib import Path
 from .schemas import Proposal, EpisodeMetadata, EpisodeResult, RewardBreakdown
 from .path_utils import resolve_base_dir
 
+# Optional: orjson encodes artifacts (numpy values included) several times faster
+try:
+    import orjson
+    _ORJSON_OPTS = (
+        orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+    )
+except ImportError:
+    orjson = None
+
+
+def _encode_json(content: Any) -> bytes:
+    """Indented JSON bytes for an artifact file."""
+    if orjson is not None:
+        return orjson.dumps(content, option=_ORJSON_OPTS)
+    return json.dumps(content, indent=2).encode()
+
 class EpisodeArtifacts:
     """
     Handles immutable episode artifact folder creation and atomic writing of:
@@ -39,18 +56,19 @@ class EpisodeArtifacts:
         
     def _write_json(self, filename: str, data: Any):
         """Atomic JSON write with strict Pydantic encoding if applicable."""
-        filepath = os.path.join(self.episode_dir, filename)
-        
         # Convert Pydantic models to dicts
         if isinstance(data, BaseModel):
             content = data.model_dump(mode='json')
         else:
             content = data
-            
-        # Atomic write pattern: write to tmp, fsync, rename
+        self._write_bytes(filename, _encode_json(content))
+
+    def _write_bytes(self, filename: str, payload: bytes):
+        """Atomic write of already-encoded bytes: write to tmp, fsync, rename."""
+        filepath = os.path.join(self.episode_dir, filename)
         tmp_path = filepath + ".tmp"
-        with open(tmp_path, 'w') as f:
-            json.dump(content, f, indent=2)
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
             f.flush()
             os.fsync(f.fileno())
             
@@ -69,6 +87,10 @@ class EpisodeArtifacts:
             merge_existing: If True, merge with existing metadata (preserves intel_snapshot)
         """
         self.ensure_directories()
+        self._write_json("metadata.json", self._metadata_payload(metadata, merge_existing))
+
+    def _metadata_payload(self, metadata, merge_existing: bool) -> Dict[str, Any]:
+        """Convert metadata to a dict, merging with metadata.json on disk if requested."""
         filepath = os.path.join(self.episode_dir, "metadata.json")
         
         # Convert to dict
@@ -99,7 +121,7 @@ class EpisodeArtifacts:
                 # If merge fails, just use new data
                 pass
         
-        self._write_json("metadata.json", obj)
+        return obj
     
     def _deep_merge(self, dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
         """Deep merge two dicts, preferring src values"""
@@ -132,6 +154,24 @@ class EpisodeArtifacts:
         }
         self._write_json("failure.json", data)
 
+    def write_failure_bundle(self, metadata, result: EpisodeResult, error: str,
+                             context: Optional[Dict[str, Any]] = None):
+        """
+        Write metadata.json, result.json and failure.json for a failed episode.
+        
+        All three payloads are encoded to bytes before any file is written, so
+        an unencodable model or context raises without leaving a partial
+        artifact set. Each file is still written atomically with its own fsync.
+        """
+        self.ensure_directories()
+        encoded = [
+            ("metadata.json", _encode_json(self._metadata_payload(metadata, merge_existing=True))),
+            ("result.json", _encode_json(result.model_dump(mode='json'))),
+            ("failure.json", _encode_json({"error": error, "context": context or {}})),
+        ]
+        for filename, payload in encoded:
+            self._write_bytes(filename, payload)
+
     def log_event(self, event_name: str, payload: Dict[str, Any]):
         """Append to logs.jsonl using internal locking (simple) or just append."""
         self.ensure_directories()
@@ -5,13 +5,70 @@ Provides local caching of historical tick data from Dune Analytics
 to enable realistic episode replay without repeated API calls.
 """
 
+import hashlib
 import json
 import os
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 import time
 
+import numpy as np
+
+# Snapshot columns exposed as float arrays (missing keys read as 0)
+TICK_FLOAT_COLUMNS = (
+    "fees_usd",
+    "pool_fees_usd_from_inputs",
+    "pool_fees_usd_two_sided",
+    "fees_usdc",
+    "fees_weth",
+    "weth_usd",
+    "volume_usd",
+    "volume_usd_two_sided",
+)
+
+
+@dataclass
+class TickWindow:
+    """
+    Tick snapshots for one cached window, plus a lazily built columnar view.
+    
+    Entries are immutable for a given (pool, start_ts, duration), so the
+    column arrays are built at most once per entry and reused on every replay.
+    """
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @cached_property
+    def cols(self) -> Dict[str, np.ndarray]:
+        """
+        One NumPy array per column: int32 'tick' plus float32 TICK_FLOAT_COLUMNS.
+        
+        v3 ticks are int24 and the float columns only feed USD sums, so 32-bit
+        storage halves the bytes every reduction streams; callers widen to
+        float64 when scaling the reduced totals.
+        """
+        rows = self.rows
+        n = len(rows)
+        cols = {"tick": np.fromiter((int(t.get("tick", 0)) for t in rows), dtype=np.int32, count=n)}
+        for name in TICK_FLOAT_COLUMNS:
+            cols[name] = np.fromiter((float(t.get(name, 0.0)) for t in rows), dtype=np.float32, count=n)
+        return cols
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """12-hex-char digest of the tick and two-sided volume columns."""
+        cols = self.cols
+        fp = hashlib.blake2b(digest_size=6)
+        fp.update(cols["tick"].tobytes())
+        fp.update(cols["volume_usd_two_sided"].tobytes())
+        fp.update(np.int64(len(self.rows)).tobytes())
+        return fp.hexdigest()
+
 
 class HistoricalDataCache:
     """
@@ -36,6 +93,9 @@ class HistoricalDataCache:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.dune_client = dune_client
         
+        # In-process entries (cache_key -> TickWindow) so replays skip JSON parsing
+        self._windows: Dict[str, TickWindow] = {}
+        
         # Cache metadata
         self.metadata_file = self.cache_dir / "cache_metadata.json"
         self.metadata = self._load_metadata()
@@ -73,6 +133,20 @@ class HistoricalDataCache:
         duration_seconds: int,
         granularity: str = "hour"
     ) -> List[Dict]:
+        """
+        Get tick data for a specific time window as a list of snapshots.
+        
+        See get_tick_window_data() for the arguments and snapshot fields.
+        """
+        return self.get_tick_window_data(pool_address, start_ts, duration_seconds, granularity).rows
+    
+    def get_tick_window_data(
+        self,
+        pool_address: str,
+        start_ts: int,
+        duration_seconds: int,
+        granularity: str = "hour"
+    ) -> TickWindow:
         """
         Get tick data for a specific time window.
         
@@ -83,7 +157,7 @@ class HistoricalDataCache:
             granularity: 'minute' or 'hour' (default: 'hour')
         
         Returns:
-            List of tick snapshots with fields:
+            TickWindow whose rows are tick snapshots with fields:
             - timestamp: Unix timestamp
             - tick: Current tick
             - price: WETH/USDC price
@@ -92,6 +166,10 @@ class HistoricalDataCache:
             - swap_count: Number of swaps
         """
         cache_key = self._cache_key(pool_address, start_ts, duration_seconds)
+        window = self._windows.get(cache_key)
+        if window is not None:
+            return window
+        
         cache_file = self._cache_file(cache_key)
         
         # Check cache first
@@ -100,14 +178,16 @@ class HistoricalDataCache:
                 with open(cache_file) as f:
                     data = json.load(f)
                 print(f"[HistoricalCache] ✅ Cache hit: {cache_key}")
-                return data.get("tick_data", [])
+                window = TickWindow(data.get("tick_data", []))
+                self._windows[cache_key] = window
+                return window
             except Exception as e:
                 print(f"[HistoricalCache] ⚠️  Cache read error: {e}")
         
         # Cache miss - fetch from Dune if available
         if self.dune_client is None:
             print(f"[HistoricalCache] ❌ Cache miss and no Dune client - returning empty")
-            return []
+            return TickWindow()
         
         print(f"[HistoricalCache] 📡 Fetching from Dune: {cache_key}")
         
@@ -116,7 +196,7 @@ class HistoricalDataCache:
             query_id = int(os.getenv('DUNE_HISTORICAL_TICKS_QUERY_ID', '0'))
             if query_id == 0:
                 print(f"[HistoricalCache] ❌ DUNE_HISTORICAL_TICKS_QUERY_ID not set")
-                return []
+                return TickWindow()
             
             # Execute query with parameters
             end_ts = start_ts + duration_seconds
@@ -149,11 +229,13 @@ class HistoricalDataCache:
             self._save_metadata()
             
             print(f"[HistoricalCache] ✅ Cached {len(tick_data)} tick snapshots")
-            return tick_data
+            window = TickWindow(tick_data)
+            self._windows[cache_key] = window
+            return window
             
         except Exception as e:
             print(f"[HistoricalCache] ❌ Error fetching from Dune: {e}")
-            return []
+            return TickWindow()
     
     def get_lp_baseline(
         self,
@@ -256,6 +338,7 @@ class HistoricalDataCache:
                 if cache_file.name != "cache_metadata.json":
                     cache_file.unlink()
             self.metadata = {"last_refresh": None, "cached_windows": {}}
+            self._windows.clear()
             self._save_metadata()
             print(f"[HistoricalCache] 🗑️  Cleared all cache")
         else:
@@ -269,6 +352,7 @@ class HistoricalDataCache:
                     if cache_file.exists():
                         cache_file.unlink()
                     del self.metadata["cached_windows"][key]
+                    self._windows.pop(key, None)
                     cleared += 1
             
             self._save_metadata()
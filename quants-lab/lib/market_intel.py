@@ -15,6 +15,7 @@ Falls back to mock data if Dune queries aren't configured.
 
 import os
 import math
+import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
 
@@ -51,6 +52,7 @@ class MarketIntelligence:
     def __init__(self):
         # Default to Dune for real on-chain Uniswap data
         self.data_source = os.getenv("INTEL_DATA_SOURCE", "dune")
+        self.cache = SmartCache(CACHE_FILE)
         
         if self.data_source == "dune" and DUNE_CONFIGURED and DUNE_AVAILABLE:
             self.dune = DuneClient()
@@ -61,7 +63,7 @@ class MarketIntelligence:
             print("[MarketIntel] Using Chainlink on-chain oracles for micro data (REAL)")
         elif self.data_source == "coingecko":
             from real_market_data_client import RealMarketDataClient
-            self.gecko = RealMarketDataClient()
+            self.gecko = RealMarketDataClient(cache=self.cache)
             print("[MarketIntel] Using CoinGecko API for micro data (REAL - no setup required)")
         elif self.data_source == "hbot":
             from hummingbot_data_client import HummingbotAPIClient
@@ -78,8 +80,6 @@ class MarketIntelligence:
         else:
             print("[MarketIntel] ⚠️  DefiLlama disabled (API Hang)")
             self.llama = None
-            
-        self.cache = SmartCache(CACHE_FILE)
         
         # Dune cache wrapper (cache-first reads + quality metadata)
         # NOTE: This does NOT fetch from Dune; scheduler (Phase 3) will populate.
@@ -194,16 +194,24 @@ class MarketIntelligence:
             return 0.0
         
         # Calculate log returns from sqrt_price_x96
-        log_returns = []
-        for i in range(1, len(swaps)):
-            try:
-                s1 = float(swaps[i - 1].get('sqrt_price_x96', 0))
-                s2 = float(swaps[i].get('sqrt_price_x96', 0))
-            except Exception:
-                continue
-            
-            if s1 > 0 and s2 > 0:
-                log_returns.append(2.0 * math.log(s2 / s1))
+        sqrt_col = getattr(swaps, 'sqrt_price_x96', None)
+        if sqrt_col is not None:
+            # Columnar SwapBatch: one vectorized pass
+            s = np.asarray(sqrt_col, dtype=np.float64)
+            s1, s2 = s[:-1], s[1:]
+            ok = (s1 > 0) & (s2 > 0)
+            log_returns = (2.0 * np.log(s2[ok] / s1[ok])).tolist()
+        else:
+            log_returns = []
+            for i in range(1, len(swaps)):
+                try:
+                    s1 = float(swaps[i - 1].get('sqrt_price_x96', 0))
+                    s2 = float(swaps[i].get('sqrt_price_x96', 0))
+                except Exception:
+                    continue
+                
+                if s1 > 0 and s2 > 0:
+                    log_returns.append(2.0 * math.log(s2 / s1))
         
         if not log_returns:
             if return_meta:
@@ -6,16 +6,79 @@ Validates pool_address, chain, network before episode execution (real mode only)
 Writes failure artifacts if validation fails.
 """
 
+import functools
+import logging
 import os
+import re
 import sys
-from typing import Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple, Optional
 from pathlib import Path
 
 # Add quants-lab to path
-QUANTS_LAB_DIR = Path(__file__).parent.parent
-sys.path.append(str(QUANTS_LAB_DIR))
+QUANTS_LAB_DIR = Path(__file__).resolve().parent.parent
 
-from schemas.contracts import Proposal
+# When run as a script, lib/ is sys.path[0] and lib/schemas.py would shadow
+# the schemas namespace package
+if __name__ == "__main__" and os.path.realpath(sys.path[0]) == str(QUANTS_LAB_DIR / "lib"):
+    sys.path.pop(0)
+
+if str(QUANTS_LAB_DIR) not in sys.path:
+    sys.path.insert(0, str(QUANTS_LAB_DIR))
+
+# Failure artifacts land under <repo>/data
+_DATA_DIR = str(Path(__file__).resolve().parent.parent.parent / "data")
+
+from pydantic import BaseModel, TypeAdapter
+
+# lib.artifacts / lib.schemas re-export schemas.contracts, so they are imported
+# only where failure artifacts are written
+if TYPE_CHECKING:
+    from schemas.contracts import Proposal
+
+# Lazy %-style args keep the success path free of formatting when INFO is off
+logger = logging.getLogger("PoolValidator")
+
+class _ProposalPoolFields(BaseModel):
+    """The Proposal fields pool validation reads (same defaults); other keys are ignored."""
+    connector_execution: str = "uniswap_v3_clmm"
+    chain: str = "ethereum"
+    network: str = "mainnet"
+    pool_address: Optional[str] = None
+
+
+# Both adapters are built on first use (then reused for every episode) so
+# importing this module doesn't pay for either schema build.
+# Decoding just the pool fields is ~2x cheaper than a full Proposal validation.
+_POOL_FIELDS_ADAPTER: Optional[TypeAdapter] = None
+_PROPOSAL_ADAPTER: Optional[TypeAdapter] = None
+
+
+def _pool_fields_adapter() -> TypeAdapter:
+    global _POOL_FIELDS_ADAPTER
+    if _POOL_FIELDS_ADAPTER is None:
+        _POOL_FIELDS_ADAPTER = TypeAdapter(_ProposalPoolFields)
+    return _POOL_FIELDS_ADAPTER
+
+
+def _proposal_adapter() -> TypeAdapter:
+    global _PROPOSAL_ADAPTER
+    if _PROPOSAL_ADAPTER is None:
+        from schemas.contracts import Proposal
+        _PROPOSAL_ADAPTER = TypeAdapter(Proposal)
+    return _PROPOSAL_ADAPTER
+
+
+# Read once per process; call refresh_env() if the variable changes at runtime
+_VALIDATION_DISABLED = os.environ.get("DISABLE_POOL_VALIDATION", "").lower() == "true"
+_STRICT_VALIDATION = os.environ.get("STRICT_VALIDATION", "").lower() == "true"
+
+
+def refresh_env() -> None:
+    """Re-read DISABLE_POOL_VALIDATION / STRICT_VALIDATION from the environment."""
+    global _VALIDATION_DISABLED, _STRICT_VALIDATION
+    _VALIDATION_DISABLED = os.environ.get("DISABLE_POOL_VALIDATION", "").lower() == "true"
+    _STRICT_VALIDATION = os.environ.get("STRICT_VALIDATION", "").lower() == "true"
+    _validate_pool_config_cached.cache_clear()
 
 # Recognized chains and networks
 VALID_CHAINS = {
@@ -29,7 +92,53 @@ VALID_CHAINS = {
     "solana": ["mainnet-beta", "devnet"]
 }
 
-def validate_pool_config(proposal: Proposal, exec_mode: str) -> Tuple[bool, Optional[str]]:
+# Precomputed hash lookups (VALID_CHAINS is kept for error-message rendering)
+VALID_CHAIN_SET = frozenset(VALID_CHAINS)
+VALID_CHAIN_NETWORK = frozenset((c, n) for c, ns in VALID_CHAINS.items() for n in ns)
+
+_VALID_CHAINS_MSG = f"Valid: {list(VALID_CHAINS.keys())}"
+_VALID_NETWORKS_MSG = {c: f"Valid: {ns}" for c, ns in VALID_CHAINS.items()}
+
+# Fixed rejection messages, built once instead of per call
+_ERR_MISSING_CHAIN = "Missing chain in proposal"
+_ERR_MISSING_NETWORK = {c: f"Missing network for chain {c}" for c in VALID_CHAINS}
+_ERR_MISSING_POOL = "Missing pool_address in proposal (required for real mode)"
+_ERR_WRONG_CONNECTOR = "Invalid connector_execution (Track A requires uniswap_v3_clmm)"
+
+# EVM address: 0x + 40 hex chars (bound match avoids an attribute lookup per call).
+# Preferred over bytes.fromhex(), which is slower and silently skips whitespace.
+_EVM_ADDR_RE = re.compile(r'^0x[0-9a-fA-F]{40}$').match
+
+# Solana pubkey: base58 encoding of 32 bytes -> 32..44 chars. The alphabet check
+# only runs with STRICT_VALIDATION so the default path stays at two compares.
+_SOLANA_ADDR_MIN_LEN = 32
+_SOLANA_ADDR_MAX_LEN = 44
+_BASE58_RE = re.compile(r'^[1-9A-HJ-NP-Za-km-z]+$').match
+
+
+def _validate_evm_addr(pool_address: str) -> Optional[str]:
+    """0x + 40 hex chars; returns the error message or None."""
+    if not _EVM_ADDR_RE(pool_address):
+        return f"Invalid pool_address: {pool_address}"
+    return None
+
+
+def _validate_solana_addr(pool_address: str) -> Optional[str]:
+    """Base58 pubkey length bounds (+ alphabet under STRICT_VALIDATION)."""
+    if not (_SOLANA_ADDR_MIN_LEN <= len(pool_address) <= _SOLANA_ADDR_MAX_LEN):
+        return f"Invalid Solana pool_address length: {pool_address}"
+    if _STRICT_VALIDATION and not _BASE58_RE(pool_address):
+        return f"Invalid Solana pool_address: {pool_address}"
+    return None
+
+
+# Address validator per chain, resolved once; every non-Solana chain is EVM
+_ADDR_VALIDATORS: Dict[str, Callable[[str], Optional[str]]] = {
+    chain: _validate_solana_addr if chain == "solana" else _validate_evm_addr
+    for chain in VALID_CHAINS
+}
+
+def validate_pool_config(proposal: "Proposal", exec_mode: str) -> Tuple[bool, Optional[str]]:
     """
     Validate pool configuration.
     
@@ -45,74 +154,76 @@ def validate_pool_config(proposal: Proposal, exec_mode: str) -> Tuple[bool, Opti
         return True, None
     
     # Check if validation is disabled
-    if os.getenv("DISABLE_POOL_VALIDATION", "false").lower() == "true":
-        print("[PoolValidator] ⚠️  Validation disabled via DISABLE_POOL_VALIDATION")
+    if _VALIDATION_DISABLED:
+        logger.warning("⚠️  Validation disabled via DISABLE_POOL_VALIDATION")
         return True, None
     
+    return _validate_pool_config_cached(
+        proposal.chain,
+        proposal.network,
+        proposal.pool_address,
+        proposal.connector_execution,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _validate_pool_config_cached(
+    chain: str,
+    network: str,
+    pool_address: Optional[str],
+    connector: str,
+) -> Tuple[bool, Optional[str]]:
+    """Pure real-mode validation core, memoized since batches reuse the same pools."""
     # Validate chain
-    chain = proposal.chain
     if not chain:
-        return False, "Missing chain in proposal"
+        return False, _ERR_MISSING_CHAIN
     
-    if chain not in VALID_CHAINS:
-        return False, f"Unrecognized chain: {chain}. Valid: {list(VALID_CHAINS.keys())}"
+    if chain not in VALID_CHAIN_SET:
+        return False, f"Unrecognized chain: {chain}. {_VALID_CHAINS_MSG}"
     
     # Validate network
-    network = proposal.network
     if not network:
-        return False, f"Missing network for chain {chain}"
+        return False, _ERR_MISSING_NETWORK[chain]
     
-    if network not in VALID_CHAINS[chain]:
-        return False, f"Invalid network '{network}' for chain '{chain}'. Valid: {VALID_CHAINS[chain]}"
+    if (chain, network) not in VALID_CHAIN_NETWORK:
+        return False, f"Invalid network '{network}' for chain '{chain}'. {_VALID_NETWORKS_MSG[chain]}"
     
     # Validate pool_address (real mode only)
-    pool_address = proposal.pool_address
     if not pool_address:
-        return False, "Missing pool_address in proposal (required for real mode)"
+        return False, _ERR_MISSING_POOL
     
-    # Basic format check (should start with 0x for EVM chains)
-    if chain != "solana":
-        if not pool_address.startswith("0x"):
-            return False, f"Invalid pool_address format: {pool_address} (should start with 0x)"
-        
-        if len(pool_address) != 42:  # 0x + 40 hex chars
-            return False, f"Invalid pool_address length: {pool_address} (should be 42 chars)"
+    # Chain-specific address format check
+    err = _ADDR_VALIDATORS[chain](pool_address)
+    if err:
+        return False, err
     
     # Validate connector_execution
-    connector = proposal.connector_execution
     if connector != "uniswap_v3_clmm":
-        return False, f"Invalid connector_execution: {connector} (Track A requires uniswap_v3_clmm)"
+        return False, _ERR_WRONG_CONNECTOR
     
     return True, None
 
 
-def validate_and_report(proposal_path: str, run_id: str, episode_id: str, exec_mode: str) -> bool:
-    """
-    Validate proposal and write failure artifacts if invalid.
-    
-    Returns:
-        True if valid, False if invalid (artifacts written)
-    """
-    import json
+def _write_failure(
+    run_id: str,
+    episode_id: str,
+    exec_mode: str,
+    error: str,
+    context: Dict[str, Any],
+    metadata: Optional[Any] = None,
+    proposal: Optional["Proposal"] = None,
+) -> None:
+    """Write metadata/result/failure artifacts for a rejected episode."""
     from lib.artifacts import EpisodeArtifacts
     from lib.schemas import EpisodeMetadata, EpisodeResult
-    import datetime
-    
-    # Load proposal
-    try:
-        with open(proposal_path) as f:
-            proposal_data = json.load(f)
-        proposal = Proposal.model_validate(proposal_data)
-    except Exception as e:
-        print(f"[PoolValidator] ❌ Failed to load proposal: {e}")
-        
-        # Write failure artifacts
-        artifacts = EpisodeArtifacts(
-            run_id=run_id,
-            episode_id=episode_id,
-            base_dir=str(Path(__file__).parent.parent.parent / "data")
-        )
-        
+
+    artifacts = EpisodeArtifacts(
+        run_id=run_id,
+        episode_id=episode_id,
+        base_dir=_DATA_DIR
+    )
+
+    if metadata is None:
         metadata = EpisodeMetadata(
             episode_id=episode_id,
             run_id=run_id,
@@ -121,55 +232,98 @@ def validate_and_report(proposal_path: str, run_id: str, episode_id: str, exec_m
             exec_mode=exec_mode,
             notes="Validation failed: could not load proposal"
         )
-        
-        result = EpisodeResult(
-            episode_id=episode_id,
-            run_id=run_id,
-            status="failed",
-            exec_mode=exec_mode,
-            error=f"Proposal validation failed: {str(e)}"
-        )
-        
-        artifacts.write_metadata(metadata)
-        artifacts.write_result(result)
-        artifacts.write_failure(
+
+    pool_fields = {}
+    if proposal is not None:
+        pool_fields = {
+            "connector_execution": proposal.connector_execution,
+            "chain": proposal.chain,
+            "network": proposal.network,
+            "pool_address": proposal.pool_address,
+        }
+
+    result = EpisodeResult(
+        episode_id=episode_id,
+        run_id=run_id,
+        status="failed",
+        exec_mode=exec_mode,
+        error=error,
+        **pool_fields
+    )
+
+    artifacts.write_failure_bundle(metadata, result, error=error, context=context)
+
+
+def validate_and_report(proposal_path: str, run_id: str, episode_id: str, exec_mode: str) -> bool:
+    """
+    Validate proposal and write failure artifacts if invalid.
+    
+    Returns:
+        True if valid, False if invalid (artifacts written)
+    """
+    # Mock mode never validates, so skip loading the proposal entirely
+    if exec_mode == "mock":
+        logger.info("⏭  Skipping validation (mock mode)")
+        return True
+
+    def report_load_failure(e: Exception) -> bool:
+        logger.error("❌ Failed to load proposal: %s", e)
+        _write_failure(
+            run_id, episode_id, exec_mode,
             error=f"Proposal validation failed: {str(e)}",
             context={"stage": "validation", "proposal_path": proposal_path}
         )
-        
         return False
+
+    # Decode only the pool fields first. Raw bytes go straight to pydantic-core's
+    # JSON parser, which beats decoding with orjson first and validating the dict.
+    try:
+        raw = Path(proposal_path).read_bytes()
+        pool_fields = _pool_fields_adapter().validate_json(raw)
+    except Exception as e:
+        return report_load_failure(e)
+
+    if validate_pool_config(pool_fields, exec_mode)[0]:
+        logger.info(
+            "✅ Validation passed: %s/%s pool=%s",
+            pool_fields.chain, pool_fields.network, pool_fields.pool_address
+        )
+        return True
+
+    # Rejected: the full proposal is only needed for its metadata in the artifacts
+    try:
+        proposal = _proposal_adapter().validate_json(raw)
+    except Exception as e:
+        return report_load_failure(e)
+
+    return validate_pool_configs([(proposal, run_id, episode_id, exec_mode)])[0]
+
+
+def validate_pool_configs(items: List[Tuple["Proposal", str, str, str]]) -> List[bool]:
+    """
+    Validate a batch of (proposal, run_id, episode_id, exec_mode) items.
     
-    # Validate
-    is_valid, error_msg = validate_pool_config(proposal, exec_mode)
+    Every item is checked first; failure artifacts are then written in a single
+    pass over the rejected items.
     
-    if not is_valid:
-        print(f"[PoolValidator] ❌ Validation failed: {error_msg}")
-        
-        # Write failure artifacts
-        artifacts = EpisodeArtifacts(
-            run_id=run_id,
-            episode_id=episode_id,
-            base_dir=str(Path(__file__).parent.parent.parent / "data")
-        )
+    Returns:
+        Per-item validity, in input order
+    """
+    checks = [validate_pool_config(proposal, exec_mode) for proposal, _, _, exec_mode in items]
+    
+    for (proposal, run_id, episode_id, exec_mode), (is_valid, error_msg) in zip(items, checks):
+        if is_valid:
+            logger.info(
+                "✅ Validation passed: %s/%s pool=%s",
+                proposal.chain, proposal.network, proposal.pool_address
+            )
+            continue
         
+        logger.error("❌ Validation failed: %s", error_msg)
         metadata = proposal.metadata
         metadata.notes = f"Validation failed: {error_msg}"
-        
-        result = EpisodeResult(
-            episode_id=episode_id,
-            run_id=run_id,
-            status="failed",
-            exec_mode=exec_mode,
-            connector_execution=proposal.connector_execution,
-            chain=proposal.chain,
-            network=proposal.network,
-            pool_address=proposal.pool_address,
-            error=error_msg
-        )
-        
-        artifacts.write_metadata(metadata)
-        artifacts.write_result(result)
-        artifacts.write_failure(
+        _write_failure(
+            run_id, episode_id, exec_mode,
             error=error_msg,
             context={
                 "stage": "validation",
@@ -177,18 +331,20 @@ def validate_and_report(proposal_path: str, run_id: str, episode_id: str, exec_m
                 "network": proposal.network,
                 "pool_address": proposal.pool_address,
                 "connector": proposal.connector_execution
-            }
+            },
+            metadata=metadata,
+            proposal=proposal
         )
-        
-        return False
     
-    print(f"[PoolValidator] ✅ Validation passed: {proposal.chain}/{proposal.network} pool={proposal.pool_address}")
-    return True
+    return [is_valid for is_valid, _ in checks]
 
 
 if __name__ == "__main__":
     import argparse
     
+    # Keep the campaign log's "[PoolValidator] ..." lines when run as a script
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s", force=True)
+    
     parser = argparse.ArgumentParser(description="Validate pool configuration")
     parser.add_argument("--proposal-path", required=True, help="Path to proposal.json")
     parser.add_argument("--run-id", required=True, help="Run ID")
@@ -7,38 +7,202 @@ Uses CoinGecko's free public API for price, volume, and market data.
 NO MOCK DATA - ALL REAL MARKET DATA
 """
 
+import logging
+
+import numpy as np
 import requests
-import math
-from typing import Dict, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 from datetime import datetime, timedelta
 
+if TYPE_CHECKING:
+    from .smart_cache import SmartCache
+
+logger = logging.getLogger("RealMarketDataClient")
+
+# Symbol -> CoinGecko coin ID
+_COIN_ID_MAP = MappingProxyType({
+    'WETH': 'ethereum',
+    'ETH': 'ethereum',
+    'USDC': 'usd-coin',
+    'USDT': 'tether',
+    'DAI': 'dai',
+    'BTC': 'bitcoin',
+    'WBTC': 'wrapped-bitcoin',
+})
+
+# /coins/ethereum market data moves on minute timescales
+MARKET_DATA_TTL_S = 60
+# market_chart history is immutable once closed; only the newest points move
+MARKET_CHART_TTL_S = {'hourly': 3600, 'minutely': MARKET_DATA_TTL_S}
+
+_Q96 = float(1 << 96)
+_PLACEHOLDER_TX_HASH = f'0x{"0" * 64}'
+_TYPICAL_LIQUIDITY = 5000000  # Typical for major pairs
+
+
+@dataclass(frozen=True)
+class SwapBatch:
+    """
+    Columnar (one array per field) swaps from get_swaps_for_pair.
+    
+    Behaves like the old List[Dict] for len(), indexing and iteration; each
+    access builds the record dict on demand. Reductions should use the
+    columns directly.
+    """
+    block_time: np.ndarray  # datetime64[ms], epoch based
+    tx_hash: np.ndarray  # object
+    amount0: np.ndarray  # float64
+    amount1: np.ndarray  # float64
+    sqrt_price_x96: np.ndarray  # object (Python ints, exceed int64)
+    liquidity: np.ndarray  # int64
+    
+    @classmethod
+    def empty(cls) -> "SwapBatch":
+        return cls(
+            block_time=np.empty(0, dtype="datetime64[ms]"),
+            tx_hash=np.empty(0, dtype=object),
+            amount0=np.empty(0, dtype=np.float64),
+            amount1=np.empty(0, dtype=np.float64),
+            sqrt_price_x96=np.empty(0, dtype=object),
+            liquidity=np.empty(0, dtype=np.int64),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.amount1)
+    
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return self._record(i)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.as_records())
+    
+    def _record(self, i: int) -> Dict[str, Any]:
+        ms = int(self.block_time[i].astype(np.int64))
+        return {
+            'block_time': datetime.fromtimestamp(ms / 1000).isoformat(),
+            'tx_hash': self.tx_hash[i],
+            'amount0': float(self.amount0[i]),
+            'amount1': float(self.amount1[i]),
+            'sqrt_price_x96': self.sqrt_price_x96[i],
+            'liquidity': int(self.liquidity[i]),
+        }
+    
+    def as_records(self) -> List[Dict[str, Any]]:
+        """Materialize the legacy list-of-dicts form."""
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            {
+                'block_time': fromtimestamp(ms / 1000).isoformat(),
+                'tx_hash': tx,
+                'amount0': a0,
+                'amount1': a1,
+                'sqrt_price_x96': sq,
+                'liquidity': liq,
+            }
+            for ms, tx, a0, a1, sq, liq in zip(
+                self.block_time.astype(np.int64).tolist(),
+                self.tx_hash.tolist(),
+                self.amount0.tolist(),
+                self.amount1.tolist(),
+                self.sqrt_price_x96.tolist(),
+                self.liquidity.tolist(),
+            )
+        ]
+
 
 class RealMarketDataClient:
     """Real market data using CoinGecko API (free, no auth required)"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional["SmartCache"] = None):
+        """
+        Args:
+            cache: Optional SmartCache used to share /coins/ethereum market data
+                across calls for MARKET_DATA_TTL_S seconds
+        """
         self.base_url = "https://api.coingecko.com/api/v3"
-        print("[RealMarketDataClient] Using CoinGecko API for REAL market data")
+        self.cache = cache
+        
+        # Keep-alive session: reuse the TLS connection across calls and let urllib3
+        # retry 429/5xx with backoff (honouring Retry-After) instead of re-handshaking
+        retry = Retry(
+            total=3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            backoff_factor=0.3,
+            respect_retry_after_header=True,
+            raise_on_status=False,  # surface the final response via raise_for_status()
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=16, max_retries=retry))
+        self._session.headers["Accept"] = "application/json"
+        
+        logger.debug("Using CoinGecko API for REAL market data")
+    
+    def __enter__(self) -> "RealMarketDataClient":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close pooled connections"""
+        self._session.close()
     
     def _get(self, endpoint: str, params: Dict = None) -> Dict:
         """Make API request with rate limiting"""
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, params=params or {}, timeout=10)
+        response = self._session.get(url, params=params or {}, timeout=(3, 10))
         response.raise_for_status()
         return response.json()
     
-    def get_coin_id(self, symbol: str) -> str:
+    @staticmethod
+    def get_coin_id(symbol: str) -> str:
         """Map symbol to CoinGecko ID"""
-        mapping = {
-            'WETH': 'ethereum',
-            'ETH': 'ethereum',
-            'USDC': 'usd-coin',
-            'USDT': 'tether',
-            'DAI': 'dai',
-            'BTC': 'bitcoin',
-            'WBTC': 'wrapped-bitcoin',
-        }
-        return mapping.get(symbol.upper(), symbol.lower())
+        return _COIN_ID_MAP.get(symbol.upper(), symbol.lower())
+    
+    def _eth_market_data(self) -> Dict[str, Any]:
+        """ETH market data (volume, market cap), served from the cache within its TTL."""
+        def fetch() -> Dict[str, Any]:
+            return self._get("/coins/ethereum").get('market_data', {})
+        
+        if self.cache is None:
+            return fetch()
+        data = self.cache.get(
+            "coingecko:market_data:ethereum",
+            fetch_func=fetch,
+            ttl_seconds=MARKET_DATA_TTL_S,
+        )
+        if not data:
+            # Nothing fresh or stale to fall back on
+            raise RuntimeError("CoinGecko market data unavailable")
+        return data
+    
+    def _market_chart_prices(self, base_id: str, days: float, interval: str, end_ts: int) -> List[List[float]]:
+        """
+        [timestamp_ms, price] points from /market_chart.
+        
+        With a cache, one response per (coin, interval, days, end-day) is
+        shared by every window that falls inside it; callers slice locally.
+        """
+        def fetch() -> List[List[float]]:
+            data = self._get(
+                f"/coins/{base_id}/market_chart",
+                params={'vs_currency': 'usd', 'days': days, 'interval': interval}
+            )
+            return data.get('prices', [])
+        
+        if self.cache is None:
+            return fetch()
+        day_bucket = int(end_ts // 86400)
+        return self.cache.get(
+            f"coingecko:market_chart:{base_id}:{interval}:{days}:{day_bucket}",
+            fetch_func=fetch,
+            ttl_seconds=MARKET_CHART_TTL_S[interval],
+            default=[],
+        )
     
     def get_swaps_for_pair(
         self,
@@ -46,11 +210,12 @@ class RealMarketDataClient:
         start_ts: int,
         end_ts: int,
         pool_address: str = None
-    ) -> List[Dict]:
+    ) -> SwapBatch:
         """
         Get real price data for volatility calculation.
         
         Uses CoinGecko's market chart data (REAL prices, not mock).
+        Returns a columnar SwapBatch; use .as_records() for List[Dict].
         """
         # Parse pair (e.g., "WETH-USDC")
         base, quote = pair.split('-')
@@ -58,42 +223,41 @@ class RealMarketDataClient:
         
         # Get price data
         duration_days = max(1, (end_ts - start_ts) / 86400)
+        days = min(duration_days, 90)  # CoinGecko limit
+        interval = 'hourly' if duration_days > 1 else 'minutely'
         
         try:
-            data = self._get(
-                f"/coins/{base_id}/market_chart",
-                params={
-                    'vs_currency': 'usd',
-                    'days': min(duration_days, 90),  # CoinGecko limit
-                    'interval': 'hourly' if duration_days > 1 else 'minutely'
-                }
-            )
-            
-            prices = data.get('prices', [])
+            prices = self._market_chart_prices(base_id, days, interval, end_ts)
+            if not prices:
+                return SwapBatch.empty()
             
-            # Convert to swap format
-            swaps = []
-            for timestamp_ms, price in prices:
-                timestamp = timestamp_ms / 1000
-                if start_ts <= timestamp <= end_ts:
-                    # Convert price to sqrt_price_x96 format
-                    sqrt_price = math.sqrt(price)
-                    sqrt_price_x96 = int(sqrt_price * (2**96))
-                    
-                    swaps.append({
-                        'block_time': datetime.fromtimestamp(timestamp).isoformat(),
-                        'tx_hash': f'0x{"0" * 64}',  # Placeholder
-                        'amount0': 1.0,  # Normalized
-                        'amount1': price,  # USD price
-                        'sqrt_price_x96': sqrt_price_x96,
-                        'liquidity': 5000000  # Typical for major pairs
-                    })
+            # Convert to swap format: filter and price math over the whole
+            # (N, 2) array, kept as columns
+            arr = np.asarray(prices, dtype=np.float64)
+            # CoinGecko returns points in time order: binary-search the window
+            # bounds on the raw ms column, then slice once
+            ts_ms = arr[:, 0]
+            lo = np.searchsorted(ts_ms, start_ts * 1000, side='left')
+            hi = np.searchsorted(ts_ms, end_ts * 1000, side='right')
+            window = arr[lo:hi]
+            px = window[:, 1]
+            n = len(px)
+            # sqrt(P) * 2**96 overflows int64, so finish as Python ints
+            sqrt_price_x96 = np.empty(n, dtype=object)
+            sqrt_price_x96[:] = [int(v) for v in np.sqrt(px) * _Q96]
             
-            return swaps
+            return SwapBatch(
+                block_time=window[:, 0].astype(np.int64).astype("datetime64[ms]"),
+                tx_hash=np.full(n, _PLACEHOLDER_TX_HASH, dtype=object),
+                amount0=np.ones(n, dtype=np.float64),  # Normalized
+                amount1=px,  # USD price
+                sqrt_price_x96=sqrt_price_x96,
+                liquidity=np.full(n, _TYPICAL_LIQUIDITY, dtype=np.int64),
+            )
             
         except Exception as e:
-            print(f"[RealMarketDataClient] Error fetching price data: {e}")
-            return []
+            logger.warning("Error fetching price data: %s", e)
+            return SwapBatch.empty()
     
     def get_pool_metrics(
         self,
@@ -108,9 +272,7 @@ class RealMarketDataClient:
         """
         try:
             # Get ETH market data (most liquid pair)
-            data = self._get("/coins/ethereum")
-            
-            market_data = data.get('market_data', {})
+            market_data = self._eth_market_data()
             
             # Real metrics from CoinGecko
             total_volume_usd = market_data.get('total_volume', {}).get('usd', 0)
@@ -129,7 +291,7 @@ class RealMarketDataClient:
             }
             
         except Exception as e:
-            print(f"[RealMarketDataClient] Error fetching pool metrics: {e}")
+            logger.warning("Error fetching pool metrics: %s", e)
             return {
                 'avg_liquidity': 0,
                 'total_volume0': 0,
@@ -142,11 +304,11 @@ class RealMarketDataClient:
         try:
             data = self._get("/ping")
             if data.get('gecko_says') == '(V3) To the Moon!':
-                print("[RealMarketDataClient] ✅ CoinGecko API connected - REAL data available")
+                logger.info("CoinGecko API connected - REAL data available")
                 return True
             return False
         except Exception as e:
-            print(f"[RealMarketDataClient] ❌ Connection failed: {e}")
+            logger.error("Connection failed: %s", e)
             return False
 
 
@@ -1,8 +1,8 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Optional
 from .schemas import EpisodeMetadata
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RunContext:
     run_id: str
     episode_id: str
@@ -12,7 +12,7 @@ class RunContext:
     seed: Optional[int]
     started_at: str
     
-    # Optional - populated later
+    # Optional - set at construction (the context is immutable)
     gateway_health: Optional[str] = None
     gateway_latency_ms: Optional[float] = None
     regime_key: Optional[str] = None
@@ -1,12 +1,107 @@
 import os
 import json
 import time
+import atexit
 import logging
-from typing import Callable, Any, Dict, Optional
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Any, Dict, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 
+# Optional: orjson encodes/decodes cache records several times faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Cross-process locking of the log; without fcntl (Windows) only threads are serialized
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 logger = logging.getLogger("SmartCache")
 
+# Don't bother compacting logs smaller than this
+_MIN_COMPACT_BYTES = 64 * 1024
+
+
+def _dumps(obj: Any) -> bytes:
+    """Compact one-line JSON, via orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # e.g. an object only json's default handling accepts
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def _parse_log(raw: bytes, path: Path) -> Optional[Dict[str, Tuple[Dict[str, Any], int]]]:
+    """
+    key -> (entry, record size) from a JSONL log, later records winning.
+    
+    Returns None if raw is not a log (legacy single-dict file).
+    """
+    records: Dict[str, Tuple[Dict[str, Any], int]] = {}
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = _loads(line)
+        except Exception:
+            if not records:
+                return None  # legacy format: one (indented) JSON dict of key -> {ts, data}
+            # Torn final line from a crash mid-append; earlier records stand
+            logger.warning(f"Skipping unreadable record in {path}")
+            continue
+        if not isinstance(record, dict) or "key" not in record:
+            return None
+        records[record["key"]] = ({'ts': record.get('ts', 0), 'data': record.get('data')}, len(line) + 1)
+    return records
+
+
+# One writer thread and one exit hook shared by every SmartCache in the process
+_write_q: "queue.Queue[SmartCache]" = queue.Queue()
+_writer_thread: Optional[threading.Thread] = None
+_writer_start_lock = threading.Lock()
+_instances: "weakref.WeakSet[SmartCache]" = weakref.WeakSet()
+
+
+def _writer_loop() -> None:
+    while True:
+        cache = _write_q.get()
+        try:
+            cache._write_dirty()
+        except Exception:
+            # Never let one bad write stop persistence for the rest of the process
+            logger.exception(f"Cache writer failed for {cache.cache_path}")
+        finally:
+            del cache  # don't keep the last instance alive while idle
+
+
+def _start_writer() -> None:
+    global _writer_thread
+    with _writer_start_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name="SmartCacheWriter", daemon=True)
+            _writer_thread.start()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for cache in list(_instances):
+        try:
+            cache.flush()
+        except Exception:
+            logger.exception(f"Failed to flush cache {cache.cache_path} at exit")
+
+
 class SmartCache:
     """
     Disk-backed cache with TTL and Stale-While-Revalidate resiliency.
@@ -14,37 +109,198 @@ class SmartCache:
     Usage:
         cache = SmartCache("data/cache/market_intel.json")
         data = cache.get("defi_llama_metrics", fetch_func=my_api_call, ttl=3600)
+    
+    On disk the cache is an append-only JSONL log of {"ts", "key", "data"}
+    records; later records win on load. Updates are appended by a background
+    writer thread, so get/set never wait on disk, and flush() (also run at
+    exit) writes anything pending, then rewrites the log as a snapshot once
+    it grows past 2x the live entries. Legacy single-dict JSON files are
+    still read.
+    
+    Safe to share between threads, and between instances or processes using
+    the same file: appends and compaction hold an flock on "<file>.lock",
+    and compaction merges records other writers appended before rewriting.
     """
     
     def __init__(self, cache_file: str):
         self.cache_path = Path(cache_file)
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
         self._memory_cache = {}
+        self._dirty: set = set()  # keys updated since their last append
+        self._write_requested = False  # a wake-up for this cache is queued
+        self._lock = threading.Lock()  # guards _memory_cache, _dirty and _write_requested
+        self._io_lock = threading.Lock()  # serializes this instance's appends and compaction
+        self._record_bytes: Dict[str, int] = {}  # key -> size of its latest record
+        self._log_file = None
+        self._lock_file = None
         self._load_from_disk()
+        _instances.add(self)
+        _start_writer()
         
     def _load_from_disk(self):
-        if self.cache_path.exists():
+        if not self.cache_path.exists():
+            return
+        try:
+            raw = self.cache_path.read_bytes()
+        except Exception as e:
+            logger.warning(f"Failed to load cache from {self.cache_path}: {e}")
+            return
+        records = _parse_log(raw, self.cache_path)
+        if records is None:
+            self._load_legacy(raw)
+            return
+        for key, (entry, size) in records.items():
+            self._memory_cache[key] = entry
+            self._record_bytes[key] = size
+
+    def _load_legacy(self, raw: bytes) -> None:
+        try:
+            self._memory_cache = json.loads(raw)
+        except Exception as e:
+            logger.warning(f"Failed to load cache from {self.cache_path}: {e}")
+            self._memory_cache = {}
+        # Convert to the log format now so appends never land after a JSON dict
+        with self._file_lock():
+            self._save_to_disk()
+
+    @staticmethod
+    def _record(key: str, entry: Dict[str, Any]) -> bytes:
+        return _dumps({'ts': entry['ts'], 'key': key, 'data': entry['data']}) + b"\n"
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive access to the log for this thread, instance and (with fcntl) process."""
+        with self._io_lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_file is None:
+                lock_path = self.cache_path.with_suffix(self.cache_path.suffix + ".lock")
+                self._lock_file = open(lock_path, 'ab')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _request_write(self) -> None:
+        with self._lock:
+            if self._write_requested:
+                return  # a pending write already covers these keys
+            self._write_requested = True
+        _write_q.put(self)
+
+    def _write_dirty(self) -> None:
+        """Append the latest entry of every dirty key to the log."""
+        with self._file_lock():
+            with self._lock:
+                self._write_requested = False
+                keys, self._dirty = self._dirty, set()
+                entries = [(key, self._memory_cache[key]) for key in keys]
+            if entries:
+                self._append(entries)
+
+    def _open_log(self):
+        """Append handle on the file currently at cache_path (reopened after another writer compacts)."""
+        if self._log_file is not None:
             try:
-                with open(self.cache_path, 'r') as f:
-                    self._memory_cache = json.load(f)
+                current = os.stat(self.cache_path)
+                held = os.fstat(self._log_file.fileno())
+                stale = (current.st_ino, current.st_dev) != (held.st_ino, held.st_dev)
+            except FileNotFoundError:
+                stale = True
+            if stale:
+                self._log_file.close()
+                self._log_file = None
+        if self._log_file is None:
+            self._log_file = open(self.cache_path, 'ab', buffering=0)
+        return self._log_file
+
+    def _append(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Append records for (key, entry) pairs to the log (one write call)."""
+        payload = b""
+        for key, entry in entries:
+            try:
+                record = self._record(key, entry)
             except Exception as e:
-                logger.warning(f"Failed to load cache from {self.cache_path}: {e}")
-                self._memory_cache = {}
+                # Skip the unencodable value; the other keys still reach disk
+                logger.error(f"Failed to serialize cache key {key!r} for {self.cache_path}: {e}")
+                continue
+            self._record_bytes[key] = len(record)
+            payload += record
+        if not payload:
+            return
+        try:
+            self._open_log().write(payload)
+        except Exception as e:
+            logger.error(f"Failed to save cache to {self.cache_path}: {e}")
+
+    def _merge_from_disk(self) -> None:
+        """Adopt records other writers appended that are newer than ours."""
+        try:
+            raw = self.cache_path.read_bytes()
+        except FileNotFoundError:
+            return
+        records = _parse_log(raw, self.cache_path)
+        if not records:
+            return
+        with self._lock:
+            for key, (entry, size) in records.items():
+                ours = self._memory_cache.get(key)
+                if ours is None or entry['ts'] > ours.get('ts', 0):
+                    self._memory_cache[key] = entry
+                    self._record_bytes[key] = size
 
     def _save_to_disk(self):
+        """Rewrite the log as one record per live key. Caller holds _file_lock()."""
+        tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
         try:
-            with open(self.cache_path, 'w') as f:
-                json.dump(self._memory_cache, f, indent=2)
+            self._merge_from_disk()
+            with self._lock:
+                snapshot = list(self._memory_cache.items())
+                self._dirty.clear()  # the snapshot covers them
+            records = {}
+            for key, entry in snapshot:
+                try:
+                    records[key] = self._record(key, entry)
+                except Exception as e:
+                    logger.error(f"Failed to serialize cache key {key!r} for {self.cache_path}: {e}")
+            tmp_path.write_bytes(b"".join(records.values()))
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+            # Atomic swap so a crash mid-write never leaves a truncated cache
+            os.replace(tmp_path, self.cache_path)
+            self._record_bytes = {key: len(rec) for key, rec in records.items()}
         except Exception as e:
             logger.error(f"Failed to save cache to {self.cache_path}: {e}")
 
+    def _maybe_compact(self) -> None:
+        try:
+            log_bytes = os.stat(self.cache_path).st_size  # includes other writers' appends
+        except FileNotFoundError:
+            return
+        if log_bytes <= _MIN_COMPACT_BYTES or log_bytes <= 2 * sum(self._record_bytes.values()):
+            return
+        # Our live set may miss other writers' keys: count them before deciding
+        self._merge_from_disk()
+        if log_bytes > 2 * sum(self._record_bytes.values()):
+            self._save_to_disk()
+
+    def flush(self) -> None:
+        """Write pending updates, then compact the log if it has outgrown the live entries."""
+        self._write_dirty()
+        with self._file_lock():
+            self._maybe_compact()
+
     def get(self, key: str, fetch_func: Optional[Callable[[], Any]] = None, ttl_seconds: int = 3600, default: Any = None) -> Any:
         """
         Get data from cache or fetch refresh.
         On fetch failure, returns stale data if available.
         """
         now = time.time()
-        entry = self._memory_cache.get(key)
+        with self._lock:
+            entry = self._memory_cache.get(key)
         
         # Check if valid cache exists
         if entry:
@@ -76,11 +332,13 @@ class SmartCache:
                  return entry['data']
 
             # Update cache
-            self._memory_cache[key] = {
-                'ts': now,
-                'data': data
-            }
-            self._save_to_disk()
+            with self._lock:
+                self._memory_cache[key] = {
+                    'ts': now,
+                    'data': data
+                }
+                self._dirty.add(key)
+            self._request_write()
             logger.info(f"Cache UPDATED for {key}")
             return data
 
@@ -103,11 +361,13 @@ class SmartCache:
             value: Data to cache (will be wrapped with timestamp)
         """
         now = time.time()
-        self._memory_cache[key] = {
-            'ts': now,
-            'data': value
-        }
-        self._save_to_disk()
+        with self._lock:
+            self._memory_cache[key] = {
+                'ts': now,
+                'data': value
+            }
+            self._dirty.add(key)
+        self._request_write()
         logger.debug(f"Cache SET for {key}")
     
     def set_many(self, items: Dict[str, Any]) -> None:
@@ -118,11 +378,13 @@ class SmartCache:
             items: Dict of {key: value} pairs to cache
         """
         now = time.time()
-        for key, value in items.items():
-            self._memory_cache[key] = {
-                'ts': now,
-                'data': value
-            }
-        self._save_to_disk()
+        with self._lock:
+            for key, value in items.items():
+                self._memory_cache[key] = {
+                    'ts': now,
+                    'data': value
+                }
+            self._dirty.update(items)
+        self._request_write()
         logger.debug(f"Cache SET_MANY for {len(items)} keys")
 
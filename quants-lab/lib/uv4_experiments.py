@@ -1,10 +1,135 @@
 from pathlib import Path
 import json
+import logging
 import pandas as pd
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 import os
 
+logger = logging.getLogger("UV4ExperimentStore")
+
+# Optional: orjson parses run files several times faster than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _ORJSON_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+
+def _dump_record(record: Dict) -> bytes:
+    """Indented JSON for a run record; numpy values and unknown types via str()."""
+    if orjson is not None:
+        return orjson.dumps(record, default=str, option=_ORJSON_OPTS)
+    return json.dumps(record, indent=2, default=_json_default).encode()
+
+
+def _json_default(obj):
+    # numpy scalars/arrays -> Python values, matching orjson's OPT_SERIALIZE_NUMPY
+    return obj.tolist() if hasattr(obj, "tolist") else str(obj)
+
+# Optional: columnar Arrow output for DuckDB/polars consumers
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Low-cardinality label columns, dictionary-encoded in to_arrow()
+_CATEGORY_COLUMNS = (
+    "experiment_version", "training_phase", "intel_source", "intel_quality",
+    "regime_at_start", "regime_at_end", "regime", "mev_risk", "gas_rating",
+)
+
+_EMPTY: Dict = {}
+
+
+# Columns to_dataframe() needs to compute the rewards, projected or not
+_REWARD_INPUTS = frozenset((
+    "total_pnl_usd", "max_drawdown_usd", "gas_cost_usd",
+    "actions_count", "inventory_drift", "sim_delta_reward",
+))
+
+# Reward inputs coerced to float by _row_from_run; declared so they never load as object
+_FLOAT_DTYPES = {
+    "total_pnl_usd": "float64", "max_drawdown_usd": "float64", "gas_cost_usd": "float64",
+    "inventory_drift": "float64", "sim_delta_reward": "float64",
+}
+
+
+def _column_matcher(columns: List[str]) -> Callable[[str], bool]:
+    """Predicate for column names; entries ending in '*' match by prefix (e.g. 'param_*')."""
+    exact = {c for c in columns if not c.endswith("*")}
+    prefixes = tuple(c[:-1] for c in columns if c.endswith("*"))
+    return lambda name: name in exact or name.startswith(prefixes)
+
+
+def _f(v) -> float:
+    return float(v) if v else 0.0
+
+
+def _row_from_run(run: Dict, path: Path) -> Dict:
+    """Flatten one run record into a DataFrame row."""
+    get = run.get
+    # One lookup per nested section
+    metrics = get("metrics", _EMPTY)
+    params = get("params") or get("params_original") or _EMPTY
+    sim = get("simulation") or _EMPTY
+    intel_start = get("intel_start", get("intel_snapshot") or _EMPTY)
+    intel_end = get("intel_end", _EMPTY)
+    istart = intel_start.get
+
+    regime_start = get("regime_at_start", istart("market_regime", "unknown"))
+
+    row = {
+        "run_id": get("run_id"),
+        "timestamp": get("timestamp"),
+        "status": get("status"),
+        "experiment_version": get("experiment_version", "v0_mock"),
+        "training_phase": get("training_phase", "unknown"),
+        "intel_source": get("intel_source", "unknown"),
+        "intel_quality": get("intel_quality", "unknown"),
+        "regime_at_start": regime_start,
+        "regime_at_end": get("regime_at_end", intel_end.get("market_regime", "unknown")),
+        
+        # Metrics
+        "total_pnl_usd": _f(metrics.get("total_pnl_usd")),
+        "max_drawdown_usd": _f(metrics.get("max_drawdown_usd")),
+        "gas_cost_usd": _f(metrics.get("gas_cost_usd")),
+        "trade_count": metrics.get("trade_count", 0),
+        "actions_count": metrics.get("actions_count", 0),
+        "inventory_drift": _f(metrics.get("inventory_drift")),
+        
+        # Intel (Start)
+        "regime": regime_start, # Backwards compat
+        "volatility": _f(istart("volatility")),
+        "avg_liquidity": _f(istart("avg_liquidity", istart("liquidity"))),
+        "volume": _f(istart("volume")),
+        "tvl": _f(istart("tvl")),
+        "tradeable": istart("tradeable", False),
+        "mev_risk": istart("mev_risk", "unknown"),
+        "gas_rating": istart("gas_rating", "unknown"),
+        "pool_health_score": istart("pool_health_score", istart("health_score", 0)),
+        "file_path": str(path),
+    }
+
+    # Flatten Params
+    for k, v in params.items():
+        row[f"param_{k}"] = v
+
+    # Simulation Metrics (Phase 4)
+    row["sim_used"] = bool(sim) and (sim.get("used", False) or sim.get("simulation_used", False))
+    row["sim_success"] = bool(sim) and (sim.get("success", False) or sim.get("simulation_success", False))
+    row["sim_gas_estimate"] = _f(sim.get("gas_estimate"))
+    row["sim_amount_out"] = _f(sim.get("amount_out"))
+    row["sim_latency_ms"] = _f(sim.get("latency_ms"))
+    row["sim_delta_reward"] = _f(sim.get("delta_reward"))
+    return row
+
+
 class UV4ExperimentStore:
     """
     Dataset loader for Uniswap V4 Experiment Runs.
@@ -20,7 +145,7 @@ class UV4ExperimentStore:
             self.root = Path(__file__).parent.parent.parent / "data" / "uniswap_v4_runs"
         
         if not self.root.exists():
-            print(f"Warning: Data directory {self.root} does not exist.")
+            logger.warning("Data directory %s does not exist.", self.root)
 
     def list_runs(self) -> List[Path]:
         if not self.root.exists(): return []
@@ -28,10 +153,9 @@ class UV4ExperimentStore:
 
     def load_run(self, path: Path) -> Dict:
         try:
-            with open(path, 'r') as f:
-                return json.load(f)
+            return _json_loads(Path(path).read_bytes())
         except Exception as e:
-            print(f"Error loading {path}: {e}")
+            logger.error("Error loading %s: %s", path, e)
             return {}
     
     def save_run(self, record: Dict, filename: str = None) -> Path:
@@ -39,12 +163,15 @@ class UV4ExperimentStore:
         Save an experiment run to the store.
         
         Args:
-            record: The experiment record dict to save.
+            record: The experiment record dict (or pydantic model) to save.
             filename: Optional custom filename. If None, auto-generates from timestamp.
         
         Returns:
             Path to the saved file.
         """
+        if hasattr(record, "model_dump"):
+            record = record.model_dump()
+        
         # Ensure directory exists
         self.root.mkdir(parents=True, exist_ok=True)
         
@@ -62,122 +189,135 @@ class UV4ExperimentStore:
         filepath = self.root / filename
         
         try:
-            with open(filepath, 'w') as f:
-                json.dump(record, f, indent=2, default=str)
-            print(f"[UV4ExperimentStore] Saved run to {filepath}")
+            filepath.write_bytes(_dump_record(record))
+            logger.debug("Saved run to %s", filepath)
             return filepath
         except Exception as e:
-            print(f"[UV4ExperimentStore] Error saving run: {e}")
+            logger.error("Error saving run: %s", e)
             raise
 
-    def to_dataframe(
-        self, 
-        min_version: str = "v1_realtime",
-        intel_quality_whitelist: tuple = ("good",), # Filter by quality
-        stable_regime_only: bool = False
-    ) -> pd.DataFrame:
+    def _filtered_rows(
+        self,
+        min_version: str,
+        intel_quality_whitelist: tuple,
+        stable_regime_only: bool,
+        keep: Optional[Callable[[str], bool]] = None,
+    ) -> List[Dict]:
         rows = []
-        for path in self.list_runs():
-            run = self.load_run(path)
+        paths = self.list_runs()
+        
+        # Run files are independent: overlap their reads on a thread pool.
+        # map() keeps list_runs() order, so row order is unchanged.
+        max_workers = max(1, min(32, (os.cpu_count() or 1) * 4, len(paths)))
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            runs = list(ex.map(self.load_run, paths))
+        
+        for path, run in zip(paths, runs):
             if not run: continue
+            row = _row_from_run(run, path)
             
             # Version Filtering
-            version = run.get("experiment_version", "v0_mock")
-            if min_version and version != min_version and min_version != "all":
+            if min_version and row["experiment_version"] != min_version and min_version != "all":
                 continue
 
-            # Load Intel
-            intel = run.get("intel_snapshot") or {}
-            intel_start = run.get("intel_start", intel)
-            intel_end = run.get("intel_end", {})
-            
-            # Metadata Extraction
-            intel_quality = run.get("intel_quality", "unknown")
-            regime_start = run.get("regime_at_start", intel_start.get("market_regime", "unknown"))
-            regime_end = run.get("regime_at_end", intel_end.get("market_regime", "unknown"))
-            training_phase = run.get("training_phase", "unknown")
-
             # Quality Filtering
-            if intel_quality not in intel_quality_whitelist and "all" not in intel_quality_whitelist:
+            if row["intel_quality"] not in intel_quality_whitelist and "all" not in intel_quality_whitelist:
                 continue
                 
             # Stability Filtering
-            if stable_regime_only and regime_start != regime_end:
+            if stable_regime_only and row["regime_at_start"] != row["regime_at_end"]:
                 continue
-            
-            row = {
-                "run_id": run.get("run_id"),
-                "timestamp": run.get("timestamp"),
-                "status": run.get("status"),
-                "experiment_version": version,
-                "training_phase": training_phase,
-                "intel_source": run.get("intel_source", "unknown"),
-                "intel_quality": intel_quality,
-                "regime_at_start": regime_start,
-                "regime_at_end": regime_end,
-                
-                # Metrics
-                "total_pnl_usd": float(run.get("metrics", {}).get("total_pnl_usd", 0)),
-                "max_drawdown_usd": float(run.get("metrics", {}).get("max_drawdown_usd", 0)),
-                "gas_cost_usd": float(run.get("metrics", {}).get("gas_cost_usd", 0)),
-                "trade_count": run.get("metrics", {}).get("trade_count", 0),
-                "actions_count": run.get("metrics", {}).get("actions_count", 0),
-                "inventory_drift": float(run.get("metrics", {}).get("inventory_drift", 0.0)),
-                
-                # Intel (Start)
-                "regime": regime_start, # Backwards compat
-                "volatility": float(intel_start.get("volatility", 0) or 0),
-                "avg_liquidity": float(intel_start.get("avg_liquidity", intel_start.get("liquidity", 0)) or 0),
-                "volume": float(intel_start.get("volume", 0) or 0),
-                "tvl": float(intel_start.get("tvl", 0) or 0),
-                "tradeable": intel_start.get("tradeable", False),
-                "mev_risk": intel_start.get("mev_risk", "unknown"),
-                "gas_rating": intel_start.get("gas_rating", "unknown"),
-                "pool_health_score": intel_start.get("pool_health_score", intel_start.get("health_score", 0)),
-                "file_path": str(path)
-            }
-            
-            pnl = row["total_pnl_usd"]
-            dd = abs(row["max_drawdown_usd"])
-            gas = row["gas_cost_usd"]
-            drift = abs(row["inventory_drift"])
-
-            row["reward_v1"] = (
-                pnl
-                - 0.5 * dd
-                - 1.0 * gas
-                - 0.01 * row["actions_count"]
-                - 0.5 * drift  # Reduced from 1.0, 50% penalty for full drift
-            )
-            
-            # Flatten Params
-            params = run.get("params") or run.get("params_original") or {}
-            for k, v in params.items():
-                row[f"param_{k}"] = v
-                
-            # Simulation Metrics (Phase 4)
-            sim = run.get("simulation") or {}
-            if sim:
-                row["sim_used"] = sim.get("used", False) or sim.get("simulation_used", False)
-                row["sim_success"] = sim.get("success", False) or sim.get("simulation_success", False)
-                row["sim_gas_estimate"] = float(sim.get("gas_estimate", 0) or 0)
-                row["sim_amount_out"] = float(sim.get("amount_out", 0) or 0)
-                row["sim_latency_ms"] = float(sim.get("latency_ms", 0) or 0)
-                row["sim_delta_reward"] = float(sim.get("delta_reward", 0) or 0)
-            else:
-                row["sim_used"] = False
-                row["sim_success"] = False
-                row["sim_gas_estimate"] = 0.0
-                row["sim_amount_out"] = 0.0
-                row["sim_latency_ms"] = 0.0
-                row["sim_delta_reward"] = 0.0
-
-            # Reward V2 (Sim-Adjusted)
-            row["reward_v2"] = row.get("reward_v1", 0) + row["sim_delta_reward"]
 
+            if keep is not None:
+                row = {k: v for k, v in row.items() if keep(k)}
             rows.append(row)
-            
-        return pd.DataFrame(rows)
+        return rows
+
+    def to_dataframe(
+        self, 
+        min_version: str = "v1_realtime",
+        intel_quality_whitelist: tuple = ("good",), # Filter by quality
+        stable_regime_only: bool = False,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Args:
+            columns: Optional projection, e.g. ["run_id", "reward_v1", "param_*"];
+                '*' suffix matches by prefix. Other keys are dropped per run
+                before the DataFrame is built.
+        """
+        wanted = keep = None
+        if columns is not None:
+            wanted = _column_matcher(columns)
+            keep = lambda name: wanted(name) or name in _REWARD_INPUTS
+        rows = self._filtered_rows(min_version, intel_quality_whitelist, stable_regime_only, keep)
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return df
+        df = df.astype(_FLOAT_DTYPES)
+        
+        # Rewards over whole columns rather than per row in the loop above
+        df["reward_v1"] = (
+            df["total_pnl_usd"]
+            - 0.5 * df["max_drawdown_usd"].abs()
+            - 1.0 * df["gas_cost_usd"]
+            - 0.01 * df["actions_count"]
+            - 0.5 * df["inventory_drift"].abs()  # Reduced from 1.0, 50% penalty for full drift
+        )
+        # Reward V2 (Sim-Adjusted)
+        df["reward_v2"] = df["reward_v1"] + df["sim_delta_reward"]
+        # Numeric params fit float32 (widths, bps, small fractions): half the bytes to scan and ship
+        narrow = {
+            c: "float32" for c, dtype in df.dtypes.items()
+            if c.startswith("param_") and pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        }
+        if narrow:
+            df = df.astype(narrow)
+        if wanted is not None:
+            df = df[[c for c in df.columns if wanted(c)]]
+        return df
+
+    def to_arrow(
+        self,
+        min_version: str = "v1_realtime",
+        intel_quality_whitelist: tuple = ("good",),
+        stable_regime_only: bool = False
+    ) -> "pa.Table":
+        """
+        Same rows and columns as to_dataframe(), as a pyarrow Table.
+        
+        Label columns are dictionary-encoded; missing param_* values are null.
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("to_arrow() requires pyarrow (pip install pyarrow)")
+        
+        rows = self._filtered_rows(min_version, intel_quality_whitelist, stable_regime_only)
+        if not rows:
+            return pa.table({})
+        # Column union in first-seen order: param_* keys vary between runs
+        names = dict.fromkeys(key for row in rows for key in row)
+        table = pa.Table.from_pydict({name: [row.get(name) for row in rows] for name in names})
+        
+        for name in _CATEGORY_COLUMNS:
+            i = table.schema.get_field_index(name)
+            if i >= 0 and pa.types.is_string(table.schema.field(i).type):
+                table = table.set_column(i, name, pc.dictionary_encode(table.column(i)))
+        
+        reward_v1 = pc.subtract(
+            pc.subtract(
+                pc.subtract(
+                    pc.subtract(
+                        table["total_pnl_usd"],
+                        pc.multiply(pc.abs(table["max_drawdown_usd"]), 0.5),
+                    ),
+                    table["gas_cost_usd"],
+                ),
+                pc.multiply(pc.cast(table["actions_count"], pa.float64()), 0.01),
+            ),
+            pc.multiply(pc.abs(table["inventory_drift"]), 0.5),
+        )
+        table = table.append_column("reward_v1", reward_v1)
+        return table.append_column("reward_v2", pc.add(reward_v1, table["sim_delta_reward"]))
 
 if __name__ == "__main__":
     store = UV4ExperimentStore()
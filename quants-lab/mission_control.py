@@ -2,11 +2,18 @@ import streamlit as st
 import pandas as pd
 import json
 import os
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 import sys
 from datetime import datetime, timedelta
 import time
 from pathlib import Path
 import subprocess
+import functools
+from collections import deque
 
 # Add lib to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'lib'))
@@ -36,6 +43,64 @@ def load_env_file(path_str):
                 os.environ[key] = val
     return True
 
+def _runs_fingerprint(root: Path) -> str:
+    """Cheap freshness key for the run directory: file count + newest mtime."""
+    mtimes = [p.stat().st_mtime_ns for p in root.glob("*.json")]
+    return f"{len(mtimes)}:{max(mtimes, default=0)}"
+
+# Everything tab 1 renders or inspects; other run fields are dropped at load time
+_V1_COLUMNS = [
+    "run_id", "timestamp", "intel_quality", "regime_at_start", "regime_at_end",
+    "reward_v1", "training_phase", "file_path", "param_*",
+]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_v1_df(root: str, fingerprint: str) -> pd.DataFrame:
+    """V1 runs as a DataFrame; re-parsed only when the fingerprint changes."""
+    df = UV4ExperimentStore(root).to_dataframe(
+        min_version="v1_realtime",
+        intel_quality_whitelist=("all",),
+        columns=_V1_COLUMNS,
+    )
+    # A handful of regime labels across all runs: store as codes, counted without string hashing
+    if 'regime_at_start' in df.columns:
+        df['regime_at_start'] = df['regime_at_start'].astype('category')
+    return df
+
+@functools.lru_cache(maxsize=8)
+def _final_cols(columns: tuple, base_cols: tuple) -> tuple:
+    """Run-log columns: base_cols then every param_* column, keeping only those present."""
+    params = [c for c in columns if c.startswith('param_')]
+    present = set(columns)
+    return tuple(c for c in (*base_cols, *params) if c in present)
+
+@st.cache_resource(show_spinner=False)
+def _store() -> UV4ExperimentStore:
+    """One experiment store per process (stateless apart from its root path)."""
+    return UV4ExperimentStore()
+
+@st.cache_resource(show_spinner=False)
+def _dune_client() -> DuneClient:
+    """One DuneClient (and HTTP session) per process."""
+    return DuneClient()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_dune(method: str, *args, **kwargs):
+    """DuneClient.<method>(...) result, reused across reruns for 5 minutes."""
+    return getattr(_dune_client(), method)(*args, **kwargs)
+
+@st.cache_data(show_spinner=False)
+def _run_paths(fingerprint: str, _df: pd.DataFrame) -> dict:
+    """run_id -> file_path for the inspector; keyed on the runs fingerprint (_df is not hashed)."""
+    # Reversed so the first row wins for a repeated run_id, as the old mask lookup did
+    return dict(zip(_df['run_id'].to_numpy()[::-1], _df['file_path'].to_numpy()[::-1]))
+
+@st.cache_data(show_spinner=False)
+def _load_run(path: str, mtime_ns: int) -> dict:
+    """Parsed run JSON; mtime_ns in the key re-parses the file only when it changes."""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
 def first_row(obj):
     """Safely extract first row from list or return dict if already dict."""
     if isinstance(obj, list) and obj:
@@ -55,13 +120,17 @@ env_paths = [
     base_dir.parent / "quants-lab" / ".env.sh"  # Explicit
 ]
 
-env_loaded = False
-for p in env_paths:
-    if load_env_file(p):
-        env_loaded = True
-        break
+@st.cache_resource(show_spinner=False)
+def _load_env_once() -> dict:
+    """Parse the first .env.sh found once per process (not on every rerun)."""
+    for p in env_paths:
+        if load_env_file(p):
+            break
+    return os.environ.copy()
+
+_ENV_CACHE = _load_env_once()
 
-api_key = os.getenv("DUNE_API_KEY", "Unknown")
+api_key = _ENV_CACHE.get("DUNE_API_KEY", "Unknown")
 masked_key = "Unknown"
 if api_key != "Unknown":
     masked_key = api_key[:4] + "..." + api_key[-4:]
@@ -87,19 +156,24 @@ with tab1:
     st.header("🦅 V1 Realtime Intelligence")
     
     try:
-        store = UV4ExperimentStore()
+        store = _store()
     except Exception as e:
         st.error(f"Error loading experiment store: {e}")
         store = None
 
     if store:
-        # Load V1 Data
-        df_v1 = store.to_dataframe(min_version="v1_realtime", intel_quality_whitelist=("all",))
+        # Load V1 Data (cached across reruns until a run file is added or changed)
+        runs_fingerprint = _runs_fingerprint(store.root)
+        df_v1 = _load_v1_df(str(store.root), runs_fingerprint)
         
         # Metrics Calculation
         total_runs = len(df_v1)
-        good_runs = len(df_v1[df_v1['intel_quality'] == 'good'])
-        stable_runs = len(df_v1[df_v1['regime_at_start'] == df_v1['regime_at_end']])
+        good_runs = stable_runs = 0
+        if total_runs:
+            # One 'good' mask, reused for the count and the chart below
+            good_mask = df_v1['intel_quality'].to_numpy() == 'good'
+            good_runs = int(good_mask.sum())
+            stable_runs = int((df_v1['regime_at_start'].to_numpy() == df_v1['regime_at_end'].to_numpy()).sum())
         
         # Determine Phase
         training_phase = "bootstrap" if good_runs < 30 else "live_tuning"
@@ -124,16 +198,16 @@ with tab1:
             with c1:
                 st.subheader("Performance (Reward V1)")
                 # Filter out bad runs for chart
-                chart_df = df_v1[df_v1['intel_quality'] == 'good'].set_index('timestamp').sort_index()
+                chart_df = df_v1.loc[good_mask].set_index('timestamp').sort_index()
                 if not chart_df.empty:
-                     st.line_chart(chart_df[['reward_v1', 'reward_v0']])
+                     st.line_chart(chart_df[['reward_v1']])
                 else:
                     st.info("No 'good' runs to chart yet.")
             
             with c2:
                 st.subheader("Regime Distribution")
                 if 'regime_at_start' in df_v1.columns:
-                    regime_counts = df_v1['regime_at_start'].value_counts()
+                    regime_counts = df_v1['regime_at_start'].value_counts(sort=False)
                     st.bar_chart(regime_counts)
             
             # --- Data Table ---
@@ -144,13 +218,13 @@ with tab1:
                 'run_id', 'timestamp', 'intel_quality', 
                 'regime_at_start', 'reward_v1', 'training_phase'
             ]
-            # Add dynamic params
-            param_cols = [c for c in df_v1.columns if c.startswith('param_')]
-            final_cols = cols_to_show + param_cols
-            final_cols = [c for c in final_cols if c in df_v1.columns]
+            # Add dynamic params (memoized on the column layout)
+            final_cols = list(_final_cols(tuple(df_v1.columns), tuple(cols_to_show)))
             
+            # Newest first; sorted once for both the table and the inspector picker
+            df_recent = df_v1.sort_values(by="timestamp", ascending=False)
             st.dataframe(
-                df_v1[final_cols].sort_values(by="timestamp", ascending=False), 
+                df_recent[final_cols], 
                 use_container_width=True
             )
             
@@ -158,18 +232,16 @@ with tab1:
             st.divider()
             st.header("🔬 Execution Inspector")
             
-            run_options = df_v1.sort_values(by="timestamp", ascending=False)['run_id'].tolist()
+            run_options = df_recent['run_id'].tolist()
             
             if run_options:
                 selected_run_id = st.selectbox("Select Run to Inspect", run_options)
                 
                 # Find the file path for this run
-                run_row = df_v1[df_v1['run_id'] == selected_run_id].iloc[0]
-                run_path = run_row['file_path']
+                run_path = _run_paths(runs_fingerprint, df_v1)[selected_run_id]
                 
                 try:
-                    with open(run_path, 'r') as f:
-                        full_run_data = json.load(f)
+                    full_run_data = _load_run(run_path, Path(run_path).stat().st_mtime_ns)
                     
                     # Metrics / Logic
                     metrics = full_run_data.get('metrics', {})
@@ -200,15 +272,19 @@ with tab1:
                     # Actions Table
                     st.subheader("📜 Action History")
                     if actions:
-                        df_actions = pd.DataFrame(actions)
+                        # Build only the shown columns instead of projecting a wide frame
+                        action_cols = ("timestamp", "action", "details", "gas_cost")
                         st.dataframe(
-                            df_actions[["timestamp", "action", "details", "gas_cost"]],
+                            pd.DataFrame.from_records(
+                                [tuple(a.get(c) for c in action_cols) for a in actions],
+                                columns=action_cols,
+                            ),
                             use_container_width=True
                         )
                         
                     
-            except Exception as e:
-                st.error(f"Failed to load details for {selected_run_id}: {e}")
+                except Exception as e:
+                    st.error(f"Failed to load details for {selected_run_id}: {e}")
 
 # --- Tab 2: Live Sensor Intel ---
 with tab2:
@@ -217,13 +293,11 @@ with tab2:
     
     if st.button("Refresh Intel", key="refresh_t2"):
         try:
-            client = DuneClient()
-            
             c1, c2 = st.columns(2)
             
             with c1:
                 st.subheader("🔥 Volatility & Gas (Q4)")
-                gas_data = client.get_gas_regime()
+                gas_data = _cached_dune("get_gas_regime")
                 gas_row = first_row(gas_data)
                 if gas_row:
                     st.json(gas_row)
@@ -231,7 +305,7 @@ with tab2:
                     st.write("No Gas Data")
                 
                 st.subheader("☠️ Toxic Flow / LVR (Q16)")
-                toxic_data = client.get_toxic_flow_index("0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640")
+                toxic_data = _cached_dune("get_toxic_flow_index", "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640")
                 toxic_row = first_row(toxic_data)
                 if toxic_row:
                     t_pct = toxic_row.get('toxic_percentage', 0)
@@ -242,7 +316,7 @@ with tab2:
 
             with c2:
                 st.subheader("⚡ JIT Liquidity Risk (Q17)")
-                jit_data = client.get_jit_liquidity_monitor("0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640")
+                jit_data = _cached_dune("get_jit_liquidity_monitor", "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640")
                 jit_row = first_row(jit_data)
                 if jit_row:
                     st.json(jit_row)
@@ -250,7 +324,7 @@ with tab2:
                     st.write("No JIT Data")
                 
                 st.subheader("🧬 Dynamic Config (Q25)")
-                conf_data = client.get_hummingbot_config()
+                conf_data = _cached_dune("get_hummingbot_config")
                 conf_row = first_row(conf_data)
                 if conf_row:
                     st.code(conf_row.get('config_yaml', 'N/A'), language='yaml')
@@ -267,14 +341,12 @@ with tab3:
     
     if st.button("🧬 Run Quants Lab Analysis", key="run_ql"):
         try:
-            client = DuneClient()
-            
             # --- Row 1: Strategy & Backtest ---
             st.divider()
             c1, c2 = st.columns(2)
             with c1:
                 st.subheader("Strategy Attribution (Q22)")
-                attr = client.get_strategy_attribution()
+                attr = _cached_dune("get_strategy_attribution")
                 latest = first_row(attr)
                 if latest:
                     eff = latest.get('rolling_24h_effectiveness', 0)
@@ -299,7 +371,7 @@ with tab3:
                 s_str = f"{start_d} 00:00:00"
                 e_str = f"{end_d} 00:00:00"
                 
-                backtest = client.get_backtesting_data(start_date=s_str, end_date=e_str)
+                backtest = _cached_dune("get_backtesting_data", start_date=s_str, end_date=e_str)
                 if backtest:
                     df_bt = pd.DataFrame(backtest)
                     st.dataframe(df_bt.head(5), use_container_width=True)
@@ -312,7 +384,7 @@ with tab3:
             c3, c4 = st.columns(2)
             with c3:
                 st.subheader("Order Impact (Q21)")
-                impact = client.get_order_impact()
+                impact = _cached_dune("get_order_impact")
                 if impact:
                     df_imp = pd.DataFrame(impact)
                     cols = [c for c in ['liquidity_tier', 'recommended_max_order_size', 'sizing_adjustment'] if c in df_imp.columns]
@@ -322,7 +394,7 @@ with tab3:
             
             with c4:
                 st.subheader("Execution Quality (Q23)")
-                qual = client.get_execution_quality()
+                qual = _cached_dune("get_execution_quality")
                 best = first_row(qual)
                 if best:
                     score = best.get('composite_execution_quality', 0)
@@ -334,7 +406,7 @@ with tab3:
             # --- Row 3: Allocation ---
             st.divider()
             st.subheader("Capital Allocation (Q24)")
-            alloc = client.get_portfolio_allocation()
+            alloc = _cached_dune("get_portfolio_allocation")
             if alloc:
                 df_alloc = pd.DataFrame(alloc)
                 # Pie Chart
@@ -366,20 +438,27 @@ with tab4:
             cwd = Path(__file__).resolve().parent.parent # scratch/
             cmd = ["python3", "hummingbot/scripts/execute_next_proposal.py"]
             try:
-                result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
-                if result.returncode == 0:
+                # Stream merged stdout/stderr as it arrives; only the last 200 lines are kept
+                log_area = st.empty()
+                tail = deque(maxlen=200)
+                with subprocess.Popen(
+                    cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+                ) as proc:
+                    for line in proc.stdout:
+                        tail.append(line)
+                        log_area.code(''.join(tail))
+                    returncode = proc.wait()
+                if returncode == 0:
                     st.success("Execution Success! Check Tab 1 for new run.")
-                    st.code(result.stdout)
                 else:
-                    st.error("Execution Failed")
-                    st.code(result.stderr)
+                    st.error(f"Execution Failed (exit code {returncode})")
             except Exception as e:
                 st.error(f"Subprocess Error: {e}")
 
     if proposal_path.exists():
         try:
-            with open(proposal_path) as f:
-                proposal = json.load(f)
+            with open(proposal_path, 'rb') as f:
+                proposal = _json_loads(f.read())
 
             st.subheader("Summary")
             st.write(f"**Generated at:** `{proposal.get('generated_at')}`")
@@ -1,15 +1,22 @@
+import functools
 import json
 import os
 import sys
 import pandas as pd
 import numpy as np
-from datetime import datetime, date, timezone
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-import yaml
 import hashlib
 
+# Optional: orjson parses calibration / result JSON several times faster than stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from lib.uv4_experiments import UV4ExperimentStore
 from lib.market_intel import MarketIntelligence
 from lib.clmm_env import MockCLMMEnvironment
@@ -18,7 +25,89 @@ from lib.clmm_env import MockCLMMEnvironment
 # CONFIGURATION RESOLVERS (EXEC-MODE AWARE + REGIME MIX)
 # ============================================================================
 
-def _load_regime_mix():
+@dataclass(frozen=True)
+class AgentEnv:
+    """Every environment variable the agent reads, parsed once into typed fields."""
+    run_id: str = "manual_run"
+    episode_id: str = "ep_0"
+    exec_mode: str = "mock"
+    seed: int = 42
+    learn_from_mock: bool = False
+    regime_mix: Optional[str] = None
+    calibration_path: Optional[str] = None
+    preempt_margin: float = 3.0
+    gas_usd: float = 2.0
+    fee_gate_usd: Optional[float] = None
+    fee_gate_mult: float = 2.0
+
+
+def parse_env() -> AgentEnv:
+    """Single pass over os.environ, with the same fallbacks the agent has always used."""
+    get = os.environ.get
+    fee_gate_usd = get("FEE_GATE_USD")
+    return AgentEnv(
+        run_id=get("RUN_ID", "manual_run"),
+        episode_id=get("EPISODE_ID", "ep_0"),
+        exec_mode=get("EXEC_MODE", "mock"),
+        seed=int(get("HB_SEED", "42")),
+        learn_from_mock=get("LEARN_FROM_MOCK", "false").lower() == "true",
+        regime_mix=get("HB_REGIME_MIX") or None,
+        calibration_path=get("DUNE_CALIBRATION_JSON") or None,
+        preempt_margin=float(get("PREEMPT_MARGIN", "3.0")),
+        gas_usd=float(get("GAS_USD", "2.0")),
+        fee_gate_usd=float(fee_gate_usd) if fee_gate_usd else None,
+        fee_gate_mult=float(get("FEE_GATE_MULT", "2.0")),
+    )
+
+
+def _read_json(path) -> Any:
+    """Parse a JSON file, via orjson when available."""
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity literals, which only stdlib json accepts
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_calibration_cached(cal_path: str, mtime_ns: int, size: int) -> dict:
+    """json.load of the calibration file; mtime/size in the key re-parse it only when it changes."""
+    return _read_json(cal_path)
+
+
+def _load_calibration(cal_path: Optional[str]) -> Optional[dict]:
+    """Parsed DUNE_CALIBRATION_JSON, or None if unset, missing or unreadable."""
+    if not cal_path:
+        return None
+    try:
+        # One stat, no exists() probe; a file that vanishes before open is treated as absent
+        st = os.stat(cal_path)
+        return _load_calibration_cached(cal_path, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️  Failed to load calibration JSON: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_regime_mix(env_mix: str) -> tuple:
+    """HB_REGIME_MIX ("regime:weight,...") as (regime, weight) pairs, parsed once per distinct value."""
+    try:
+        mix = {}
+        for pair in env_mix.split(","):
+            regime, weight = pair.split(":")
+            mix[regime.strip()] = float(weight.strip())
+        if not mix:
+            raise ValueError("HB_REGIME_MIX parsed empty")
+        return tuple(mix.items())
+    except Exception as e:
+        raise ValueError(f"HB_REGIME_MIX malformed: {env_mix}. Error: {e}") from e
+
+
+def _load_regime_mix(env: AgentEnv, calibration: Optional[dict] = None):
     """
     Load regime mix with strict precedence:
     1) HB_REGIME_MIX env var (fail fast if malformed)
@@ -28,26 +117,13 @@ def _load_regime_mix():
     Returns: (mix_dict, source_string)
     """
     # (1) Env override - FAIL FAST if malformed
-    env_mix = os.environ.get("HB_REGIME_MIX")
-    if env_mix:
-        try:
-            mix = {}
-            for pair in env_mix.split(","):
-                regime, weight = pair.split(":")
-                mix[regime.strip()] = float(weight.strip())
-            if not mix:
-                raise ValueError("HB_REGIME_MIX parsed empty")
-            return mix, "env"
-        except Exception as e:
-            raise ValueError(f"HB_REGIME_MIX malformed: {env_mix}. Error: {e}") from e
+    if env.regime_mix:
+        return dict(_parse_regime_mix(env.regime_mix)), "env"
     
-    # (2) Calibration JSON
-    cal_path = os.environ.get("DUNE_CALIBRATION_JSON")
-    if cal_path and Path(cal_path).exists():
+    # (2) Calibration JSON (already parsed by the caller)
+    if calibration is not None:
         try:
-            with open(cal_path) as f:
-                cal = json.load(f)
-            rm = cal.get("calibrated_regime_mix")
+            rm = calibration.get("calibrated_regime_mix")
             if isinstance(rm, dict) and rm:
                 return {k: float(v) for k, v in rm.items()}, "calibration_json"
             else:
@@ -59,7 +135,7 @@ def _load_regime_mix():
     return {"mean_revert": 0.4, "jumpy": 0.3, "trend_up": 0.3}, "default"
 
 
-def _resolve_gating_constants(calibration: dict = None):
+def _resolve_gating_constants(env: AgentEnv, calibration: dict = None):
     """
     Resolve EV-gating constants based on EXEC_MODE.
     
@@ -68,21 +144,20 @@ def _resolve_gating_constants(calibration: dict = None):
     
     Returns: (GAS_USD, FEE_GATE, LOSS_BREAKER, PREEMPT_MARGIN)
     """
-    exec_mode = os.environ.get("EXEC_MODE", "mock").lower()
+    exec_mode = env.exec_mode.lower()
     
     LOSS_BREAKER = -1000.0
-    PREEMPT_MARGIN = float(os.environ.get("PREEMPT_MARGIN", "3.0"))
+    PREEMPT_MARGIN = env.preempt_margin
     
     if exec_mode == "mock":
         # Mock: use observed gas costs
-        GAS_USD = float(os.environ.get("GAS_USD", "2.0"))
+        GAS_USD = env.gas_usd
         
         # Allow explicit FEE_GATE_USD or compute from multiplier
-        if os.environ.get("FEE_GATE_USD"):
-            FEE_GATE = float(os.environ["FEE_GATE_USD"])
+        if env.fee_gate_usd is not None:
+            FEE_GATE = env.fee_gate_usd
         else:
-            mult = float(os.environ.get("FEE_GATE_MULT", "2.0"))
-            FEE_GATE = mult * GAS_USD
+            FEE_GATE = env.fee_gate_mult * GAS_USD
     else:
         # Live/Paper: use Dune calibration
         if calibration and "calibrated_constants" in calibration:
@@ -118,58 +193,122 @@ OOR_CRITICAL_BY_REGIME = {
 }
 OOR_CRITICAL_DEFAULT = 92.0
 
+# Regime groups used by the proposal decision ladder
+_TREND_REGIMES = frozenset(("trend_up", "trend_down"))
+_FAST_MOVING_REGIMES = frozenset(("trend_up", "trend_down", "jumpy"))
+_CALM_REGIMES = frozenset(("low", "mid"))
+_TIGHTENING_CANDIDATES = (200, 400, 800, 1200)
+
+
+def _estimate_tightening_opportunity(
+    current_width: int,
+    regime: str,
+    in_range_steps: int,
+    current_fees_usd: float,
+    gas_usd: float,
+):
+    """Check if tightening offers positive EV after gas, amortized over stable streak."""
+    if current_width < 200: return None # Already tight
+    
+    # Candidates narrower than the current band, tightest first
+    candidates = [c for c in _TIGHTENING_CANDIDATES if c < current_width]
+    
+    # Proxy calc: narrower width = higher fee multiplier (approx 1/width)
+    # This is a heuristic. 
+    # Uplift factor = current_width / candidate_width
+    
+    streak = in_range_steps
+    base_cap = 6 if regime != "jumpy" else 3
+    hold_horizon = max(1, min(base_cap, 1 + (streak // 2))) # slower streak growth
+    
+    gas_buffer = gas_usd * 1.5
+    
+    for cand_w in candidates:
+        uplift_mult = float(current_width) / cand_w
+        projected_fees_per_ep = current_fees_usd * uplift_mult
+        delta_per_ep = projected_fees_per_ep - current_fees_usd
+        
+        delta_total = delta_per_ep * hold_horizon
+        
+        if delta_total > gas_buffer:
+            return cand_w, delta_total
+    
+    return None
+
+# Learnable params and their bounds for the per-regime CEM belief update
+LEARNABLE_PARAMS = {
+    'width_pts': {'min': 5, 'max': 5000, 'default': 200},
+    'rebalance_threshold_pct': {'min': 0.01, 'max': 0.50, 'default': 0.05},
+    'spread_bps': {'min': 1, 'max': 500, 'default': 20},
+    'order_size': {'min': 0.01, 'max': 5.0, 'default': 0.1},
+    'refresh_interval': {'min': 10, 'max': 300, 'default': 60}
+}
+BELIEF_WINDOW_SIZE = 20  # most recent runs per regime considered for elites
+
 # Use Pydantic schemas
 from lib.schemas import QuoteResult, RewardBreakdown, Proposal, EpisodeMetadata
 from schemas.contracts import AgentConfig
 from schemas.learning_state import LearningState, RegimeState, ParameterDistribution
-from lib.hummingbot_api_wrapper import hummingbot_api
 from lib.json_logger import setup_logger
 from lib.artifacts import EpisodeArtifacts
 
 OUTPUT_FILE = Path(__file__).parent.parent / "data" / "uniswap_v4_param_proposals.json"
 
-class NumpyEncoder(json.JSONEncoder):
-    """
-    JSON encoder that safely handles NumPy/Pandas types
-    """
-    def default(self, obj):
-        if isinstance(obj, np.integer): return int(obj)
-        if isinstance(obj, np.floating): return float(obj)
-        if isinstance(obj, np.ndarray): return obj.tolist()
-        if pd is not None and isinstance(obj, pd.Timestamp): return obj.isoformat()
-        if isinstance(obj, (datetime, date)): return obj.isoformat()
-        return super().default(obj)
+# path -> (mtime_ns, config_hash, parsed dict); agent_config.yml is re-read only when it changes
+_CONFIG_CACHE: Dict[str, tuple] = {}
+
+
+def _load_agent_config(config_path: Path) -> tuple:
+    """(sha256[:8] of agent_config.yml, parsed YAML), cached by path and mtime."""
+    mtime_ns = config_path.stat().st_mtime_ns
+    cached = _CONFIG_CACHE.get(str(config_path))
+    if cached is None or cached[0] != mtime_ns:
+        import yaml  # only needed on a cache miss
+        
+        # One read: hash and parse the same bytes
+        content = config_path.read_bytes()
+        config_hash = hashlib.sha256(content).hexdigest()[:8]
+        # libyaml's C loader when PyYAML was built with it
+        cfg_dict = yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        # One entry per path: an edited file replaces its stale parse instead of adding to it
+        cached = _CONFIG_CACHE[str(config_path)] = (mtime_ns, config_hash, cfg_dict)
+    return cached[1:]
+
+
+def _ep_index(name: str) -> int:
+    """Numeric suffix of an ep_<n> directory name, -1 if it has none."""
+    try:
+        return int(name.split("_")[-1])
+    except ValueError:
+        return -1
+
 
 class Phase5LearningAgent:
     def __init__(self, config: AgentConfig = None):
         self.config_hash = "manual"
-        self.run_id = os.environ.get("RUN_ID", "manual_run")
-        self.episode_id = os.environ.get("EPISODE_ID", "ep_0")
-        self.exec_mode = os.environ.get("EXEC_MODE", "mock")
-        self.seed = int(os.environ.get("HB_SEED", "42"))
-        self.learn_from_mock = os.environ.get("LEARN_FROM_MOCK", "false").lower() == "true"
+        self.env = env = parse_env()
+        self.run_id = env.run_id
+        self.episode_id = env.episode_id
+        self.exec_mode = env.exec_mode
+        self.seed = env.seed
+        self.learn_from_mock = env.learn_from_mock
         
         # Load external YAML config if not provided
         if config is None:
             config_path = Path(__file__).parent.parent / "conf" / "agent_config.yml"
-            if config_path.is_file():
-                with open(config_path) as f:
-                    f.seek(0)
-                    content = f.read()
-                    self.config_hash = hashlib.sha256(content.encode()).hexdigest()[:8]
-                    f.seek(0)
-                    cfg_dict = yaml.safe_load(f)
-                
+            try:
+                # The cache's stat doubles as the existence check
+                self.config_hash, cfg_dict = _load_agent_config(config_path)
+            except FileNotFoundError:
+                config = AgentConfig()
+            else:
                 try:
                     config = AgentConfig(**cfg_dict)
                 except Exception as e:
                     print(f"❌ Invalid Config in agent_config.yml: {e}")
                     sys.exit(1)
-            else:
-                config = AgentConfig()
         
         self.config = config
-        self.data = hummingbot_api
         self.store = UV4ExperimentStore()
         self.intel = MarketIntelligence()
         self.logger = setup_logger("Phase5Agent")
@@ -186,20 +325,22 @@ class Phase5LearningAgent:
         
         self.logger.info("Phase 5 Agent Initialized", extra={"config_hash": self.config_hash, "state_version": self.learning_state.version})
         
+        # Calibration JSON is opened once and shared by the regime mix and gating constants
+        calibration = _load_calibration(env.calibration_path)
+        
         # ✅ Load regime mix with strict precedence (CRITICAL FIX)
-        self.regime_mix, self.regime_mix_source = _load_regime_mix()
+        self.regime_mix, self.regime_mix_source = _load_regime_mix(env, calibration)
         
-        # ✅ Load gating constants (exec-mode aware)
-        calibration = None
-        cal_path = os.environ.get("DUNE_CALIBRATION_JSON")
-        if cal_path and Path(cal_path).exists():
-            try:
-                with open(cal_path) as f:
-                    calibration = json.load(f)
-            except Exception as e:
-                self.logger.warning(f"Failed to load calibration: {e}")
+        # Regime draw inputs are fixed for the agent's lifetime: validate and normalize once
+        self._regimes_arr = np.array(list(self.regime_mix))
+        weights = np.fromiter(self.regime_mix.values(), dtype=np.float64, count=len(self.regime_mix))
+        wsum = weights.sum()
+        if wsum <= 0:
+            raise ValueError(f"Invalid regime_mix weights (sum<=0): {self.regime_mix}")
+        self._regime_weights = weights / wsum
         
-        self.GAS_USD, self.FEE_GATE, self.LOSS_BREAKER, self.PREEMPT_MARGIN = _resolve_gating_constants(calibration)
+        # ✅ Load gating constants (exec-mode aware)
+        self.GAS_USD, self.FEE_GATE, self.LOSS_BREAKER, self.PREEMPT_MARGIN = _resolve_gating_constants(env, calibration)
         
         # CRITICAL: Log so it's impossible to run with wrong mix silently
         self.logger.info(f"🔁 Using regime mix source: {self.regime_mix_source}")
@@ -207,6 +348,12 @@ class Phase5LearningAgent:
         self.logger.info(f"💰 Gating: GAS=${self.GAS_USD:.2f}, FEE_GATE=${self.FEE_GATE:.2f} (exec_mode={self.exec_mode})")
 
     
+    @functools.cached_property
+    def data(self):
+        """Hummingbot API wrapper; importing it builds the API and mock clients, so defer until used."""
+        from lib.hummingbot_api_wrapper import hummingbot_api
+        return hummingbot_api
+    
     def _load_prev_result(self) -> Optional[dict]:
         """Load previous episode result with robust path resolution and numeric sorting."""
         from lib.path_utils import resolve_base_dir
@@ -216,33 +363,35 @@ class Phase5LearningAgent:
         
         self.logger.info(f"[DEBUG] Looking for previous episodes in: {episodes_dir}")
         
-        if not episodes_dir.exists():
+        # One readdir for the episode dirs; only the newest result.json is opened
+        try:
+            with os.scandir(episodes_dir) as entries:
+                episodes = [
+                    (_ep_index(entry.name), entry.path)
+                    for entry in entries
+                    if entry.name.startswith("ep_") and entry.is_dir()
+                ]
+        except FileNotFoundError:
             self.logger.info(f"[DEBUG] Episodes directory does not exist yet")
             return None
         
-        result_paths = list(episodes_dir.glob("ep_*/result.json"))
-        
         # Numeric sort to avoid ep_10 vs ep_2 ordering bug
-        def _ep_index(p: Path) -> int:
-            try:
-                return int(p.parent.name.split("_")[-1])
-            except Exception:
-                return -1
+        episodes.sort(reverse=True)
+        self.logger.info(f"[DEBUG] Found {len(episodes)} episode directories")
         
-        result_paths.sort(key=_ep_index)
-        self.logger.info(f"[DEBUG] Found {len(result_paths)} previous episodes")
-        
-        if not result_paths:
-            return None
-        
-        try:
-            last_ep_path = result_paths[-1]
-            self.logger.info(f"[DEBUG] Loading last result from: {last_ep_path}")
-            with open(last_ep_path) as f:
-                return json.load(f)
-        except Exception as e:
-            self.logger.warning(f"[WARN] Could not load previous result: {e}")
-            return None
+        # Newest first; an episode still in flight has no result.json yet
+        for _, ep_dir in episodes:
+            last_ep_path = os.path.join(ep_dir, "result.json")
+            try:
+                prev_result = _read_json(last_ep_path)
+                self.logger.info(f"[DEBUG] Loaded last result from: {last_ep_path}")
+                return prev_result
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                self.logger.warning(f"[WARN] Could not load previous result: {e}")
+                return None
+        return None
 
     def calculate_reward(self, row: pd.Series) -> RewardBreakdown:
         # Simplistic wrapper for learning update
@@ -259,6 +408,30 @@ class Phase5LearningAgent:
         total_reward = sum(comp.values())
         return RewardBreakdown(total=total_reward, components=comp)
 
+    def _reward_total(self, pnl, drawdown, gas):
+        """
+        calculate_reward(...).total without building the model.
+        
+        Works on floats or whole pandas columns alike.
+        """
+        w = self.config.reward_weights
+        return (
+            pnl * w.get('pnl', 1.0)
+            - abs(drawdown) * w.get('drawdown', 0.5)
+            - abs(gas) * w.get('gas', 0.3)
+        )
+
+    def calculate_rewards(self, df: pd.DataFrame) -> pd.Series:
+        """calculate_reward(row).total for every row, as column arithmetic."""
+        def col(name: str):
+            # Plain float64 ndarrays: no index alignment between the three operands
+            if name not in df.columns:
+                return np.zeros(len(df))
+            return df[name].to_numpy(dtype=np.float64, na_value=0.0)
+        
+        total = self._reward_total(col('total_pnl_usd'), col('max_drawdown_usd'), col('gas_cost_usd'))
+        return pd.Series(total, index=df.index)
+
     def update_beliefs_from_history(self, df: pd.DataFrame) -> bool:
         """
         Update beliefs from history.
@@ -273,41 +446,44 @@ class Phase5LearningAgent:
         if 'regime' not in df.columns:
              df['regime'] = 'vol_mid-liq_low'
              
-        regimes = df['regime'].unique()
-        for r in regimes:
-             grp = df[df['regime'] == r]
-             if grp.empty: continue
-             
+        learnable_params = LEARNABLE_PARAMS
+        param_names = [p for p in learnable_params if f"param_{p}" in df.columns]
+        # One float matrix for every learnable param column; rows sliced per regime below
+        param_arr = df[[f"param_{p}" for p in param_names]].to_numpy(dtype=np.float64, na_value=np.nan)
+        rewards = df['calculated_reward'].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        # Row positions per regime, in order of first appearance (one pass over the column)
+        for r, positions in df.groupby('regime', sort=False, observed=True).indices.items():
              if r not in self.learning_state.regimes:
                  self.learning_state.regimes[r] = RegimeState(regime=r)
                  
              regime_state = self.learning_state.regimes[r]
              
              # Windowed CEM
-             WINDOW_SIZE = 20
-             recent_history = grp.tail(WINDOW_SIZE)
-             n_elites = max(1, int(len(recent_history) * 0.25))
-             elites = recent_history.nlargest(n_elites, 'calculated_reward')
+             recent = positions[-BELIEF_WINDOW_SIZE:]
+             n_elites = max(1, int(len(recent) * 0.25))
+             # Same picks as DataFrame.nlargest: NaN rewards never elite, ties keep the earlier row
+             recent_rewards = rewards[recent]
+             order = np.argsort(-recent_rewards, kind='stable')[:n_elites]
+             elites = param_arr[recent[order[~np.isnan(recent_rewards[order])]]]
              
-             learnable_params = {
-                'width_pts': {'min': 5, 'max': 5000, 'default': 200},
-                'rebalance_threshold_pct': {'min': 0.01, 'max': 0.50, 'default': 0.05},
-                'spread_bps': {'min': 1, 'max': 500, 'default': 20},
-                'order_size': {'min': 0.01, 'max': 5.0, 'default': 0.1},
-                'refresh_interval': {'min': 10, 'max': 300, 'default': 60}
-             }
+             # Mean / sample std of every param column at once, ignoring NaNs
+             valid = ~np.isnan(elites)
+             counts = valid.sum(axis=0)
+             with np.errstate(invalid='ignore', divide='ignore'):
+                 means = np.where(valid, elites, 0.0).sum(axis=0) / counts
+                 sq_dev = np.where(valid, elites - means, 0.0) ** 2
+                 stds = np.sqrt(sq_dev.sum(axis=0) / (counts - 1))
              
              updated_counts = 0
-             for param_name, limits in learnable_params.items():
-                col_name = f"param_{param_name}"
-                if col_name not in elites.columns: continue
-                    
-                values = elites[col_name].dropna().astype(float)
-                if values.empty: continue
+             for j, param_name in enumerate(param_names):
+                n_values = int(counts[j])
+                if n_values == 0: continue
+                limits = learnable_params[param_name]
                 
-                mean_val = float(values.mean())
+                mean_val = float(means[j])
                 min_std = (limits['max'] - limits['min']) * 0.05
-                std_val = max(min_std, float(values.std()) if len(values) > 1 else min_std)
+                std_val = max(min_std, float(stds[j]) if n_values > 1 else min_std)
                 
                 # Smooth Update
                 if param_name in regime_state.params:
@@ -315,18 +491,20 @@ class Phase5LearningAgent:
                     alpha = 0.5
                     new_mean = old.mean * (1-alpha) + mean_val * alpha
                     new_std = old.std_dev * (1-alpha) + std_val * alpha
-                    count = old.sample_count + len(values)
+                    count = old.sample_count + n_values
                 else:
                     new_mean = mean_val
                     new_std = std_val
-                    count = len(values)
+                    count = n_values
                     
-                regime_state.params[param_name] = ParameterDistribution(
+                # Inputs are already plain floats/ints: skip validation here,
+                # LearningState.load/save validate at the file boundary
+                regime_state.params[param_name] = ParameterDistribution.model_construct(
                     name=param_name,
                     mean=new_mean,
                     std_dev=new_std,
-                    min_val=limits['min'],
-                    max_val=limits['max'],
+                    min_val=float(limits['min']),
+                    max_val=float(limits['max']),
                     sample_count=count
                 )
                 updated_counts += 1
@@ -349,12 +527,17 @@ class Phase5LearningAgent:
         learning_update_applied = False
         learning_update_reason = None
         
-        df = self.store.to_dataframe(min_version="v1_realtime", intel_quality_whitelist=("good",), stable_regime_only=False)
+        df = self.store.to_dataframe(
+            min_version="v1_realtime",
+            intel_quality_whitelist=("good",),
+            stable_regime_only=False,
+            columns=["regime", "reward_v1", "total_pnl_usd", "max_drawdown_usd", "gas_cost_usd", "param_*"],
+        )
         if not df.empty:
             if 'reward_v1' in df.columns:
                 df['calculated_reward'] = df['reward_v1']
             else:
-                df['calculated_reward'] = df.apply(lambda row: self.calculate_reward(row).total, axis=1)
+                df['calculated_reward'] = self.calculate_rewards(df)
             learning_update_applied = self.update_beliefs_from_history(df)
             if not learning_update_applied:
                 learning_update_reason = "mock_mode_learning_disabled"
@@ -366,14 +549,7 @@ class Phase5LearningAgent:
         POOL = "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
         
         
-        # ✅ Select regime using loaded mix (already validated in __init__)
-        regimes = list(self.regime_mix.keys())
-        weights_raw = [float(self.regime_mix[r]) for r in regimes]
-        wsum = sum(weights_raw)
-        if wsum <= 0:
-            raise ValueError(f"Invalid regime_mix weights (sum<=0): {self.regime_mix}")
-        weights = [w / wsum for w in weights_raw]  # normalize for np.choice
-        
+        # ✅ Select regime using loaded mix (validated and normalized in __init__)
         # Deterministic selection with episode seed
         try:
             ep_idx = int(episode_id.split("_")[-1]) if "_" in episode_id else 0
@@ -381,9 +557,13 @@ class Phase5LearningAgent:
             ep_idx = 0
         
         rng = np.random.RandomState(self.seed + ep_idx)
-        current_regime = rng.choice(regimes, p=weights)
+        current_regime = str(rng.choice(self._regimes_arr, p=self._regime_weights))
         
         self.logger.info(f"📍 Selected regime for {episode_id}: {current_regime}")
+        
+        # Gating constants and this regime's OOR threshold, bound once for the decision ladder
+        GAS, FEE_GATE, LOSS, PREEMPT = self.GAS_USD, self.FEE_GATE, self.LOSS_BREAKER, self.PREEMPT_MARGIN
+        oor_critical = OOR_CRITICAL_BY_REGIME.get(current_regime, OOR_CRITICAL_DEFAULT)
  
         
         # 3. Propose (Sample from Beliefs)
@@ -406,12 +586,16 @@ class Phase5LearningAgent:
         # Use Learned if available
         if current_regime in self.learning_state.regimes:
             reg = self.learning_state.regimes[current_regime]
-            import random
-            for k in params.keys():
-                if k in reg.params:
-                    dist = reg.params[k]
-                    val = random.gauss(dist.mean, dist.std_dev)
-                    params[k] = max(dist.min_val, min(dist.max_val, val))
+            learned = [k for k in params if k in reg.params]
+            if learned:
+                # One draw + clip for every learned param, from the episode's regime-choice stream
+                dists = [reg.params[k] for k in learned]
+                means = np.array([d.mean for d in dists], dtype=np.float64)
+                stds = np.abs([d.std_dev for d in dists], dtype=np.float64)
+                lo = np.array([d.min_val for d in dists], dtype=np.float64)
+                hi = np.array([d.max_val for d in dists], dtype=np.float64)
+                vals = np.clip(rng.normal(means, stds), lo, hi)
+                params.update(zip(learned, vals.tolist()))
         
         # ✅ DELIVERABLE 1: Determine action based on last episode with robust hold logic
         action = "auto"  # default
@@ -457,69 +641,30 @@ class Phase5LearningAgent:
             self.logger.info(f"[DEBUG] Previous: OOR={prev_oor:.1f}%, Alpha=${prev_alpha:.2f}, Fees=${prev_fees:.2f}, Gas=${prev_gas:.2f}, Action={prev_action}, Width={prev_width}")
             
             # ✅ EV-GATED DECISION LOGIC with cooldowns, preemption, and AMORTIZED TIGHTENING
-            oor_critical = OOR_CRITICAL_BY_REGIME.get(current_regime, OOR_CRITICAL_DEFAULT)
-            
-            # Helper for Amortized Tightening
-            def estimate_tightening_opportunity(
-                current_width: int,
-                regime: str,
-                in_range_steps: int,
-                current_fees_usd: float
-            ):
-                """Check if tightening offers positive EV after gas, amortized over stable streak."""
-                if current_width < 200: return None # Already tight
-                
-                # Setup Candidates
-                candidates = [200, 400, 800, 1200]
-                candidates = [c for c in candidates if c < current_width]
-                candidates.sort() # check tightest first? or conservative first?
-                
-                # Proxy calc: narrower width = higher fee multiplier (approx 1/width)
-                # This is a heuristic. 
-                # Uplift factor = current_width / candidate_width
-                
-                streak = in_range_steps
-                base_cap = 6 if regime != "jumpy" else 3
-                hold_horizon = max(1, min(base_cap, 1 + (streak // 2))) # slower streak growth
-                
-                gas_buffer = self.GAS_USD * 1.5
-                
-                for cand_w in candidates:
-                    uplift_mult = float(current_width) / cand_w
-                    projected_fees_per_ep = current_fees_usd * uplift_mult
-                    delta_per_ep = projected_fees_per_ep - current_fees_usd
-                    
-                    delta_total = delta_per_ep * hold_horizon
-                    
-                    if delta_total > gas_buffer:
-                        return cand_w, delta_total
-                
-                return None
-
             # Extract In-Range Streak
             ir_steps = 0
             if "position_after" in prev_result and prev_result["position_after"]:
                 ir_steps = prev_result["position_after"].get("in_range_steps", 0)
 
             # 1) COOLDOWN AFTER WIDEN
-            if prev_action == "widen" and prev_alpha > self.LOSS_BREAKER:
+            if prev_action == "widen" and prev_alpha > LOSS:
                 action = "hold"
                 rule_fired = "cooldown_after_widen"
                 self.logger.info(f"💤 Cooldown after widen")
             
             # 2) COOLDOWN AFTER REBALANCE (if low fees)
-            elif prev_action == "rebalance" and prev_alpha > self.LOSS_BREAKER and prev_fees < self.FEE_GATE:
+            elif prev_action == "rebalance" and prev_alpha > LOSS and prev_fees < FEE_GATE:
                 action = "hold"
                 rule_fired = "cooldown_after_rebalance_low_fees"
                 self.logger.info(f"💤 Cooldown after rebalance")
             
             # 3) TREND PREEMPTION
-            elif (current_regime in ["trend_up", "trend_down"] and 
+            elif (current_regime in _TREND_REGIMES and 
                   prev_action == "hold" and
-                  prev_oor >= (oor_critical - self.PREEMPT_MARGIN) and
+                  prev_oor >= (oor_critical - PREEMPT) and
                   prev_oor < oor_critical and
-                  prev_fees < self.FEE_GATE and
-                  prev_alpha > self.LOSS_BREAKER):
+                  prev_fees < FEE_GATE and
+                  prev_alpha > LOSS):
                 
                 action = "widen"
                 rule_fired = "trend_preempt_widen"
@@ -531,7 +676,7 @@ class Phase5LearningAgent:
                 )
 
             # 4) LOSS BREAKER
-            elif prev_alpha <= self.LOSS_BREAKER:
+            elif prev_alpha <= LOSS:
                 if prev_oor >= oor_critical:
                     action = "widen"
                     rule_fired = "loss_breaker_widen"
@@ -541,7 +686,7 @@ class Phase5LearningAgent:
             
             # 5) CRITICAL OOR
             elif prev_oor >= oor_critical:
-                widen_allowed = (prev_fees >= self.FEE_GATE or prev_alpha <= -500.0)
+                widen_allowed = (prev_fees >= FEE_GATE or prev_alpha <= -500.0)
                 if widen_allowed:
                     action = "widen"
                     rule_fired = "widen_oor_critical_ev_ok"
@@ -552,31 +697,31 @@ class Phase5LearningAgent:
             # 6) AMORTIZED TIGHTENING (New Feature)
             # Only consider if currently holding, in range, and stable
             elif (prev_oor < 10.0 and prev_width and ir_steps > 2): 
-                opportunity = estimate_tightening_opportunity(
-                    prev_width, current_regime, ir_steps, prev_fees
+                opportunity = _estimate_tightening_opportunity(
+                    prev_width, current_regime, ir_steps, prev_fees, GAS
                 )
                 if opportunity:
                     cand_w, delta = opportunity
                     action = "rebalance"
                     rule_fired = f"amortized_tightening_to_{cand_w}"
                     target_width_pts = cand_w
-                    self.logger.info(f"🎯 Amortized Tightening! {prev_width}->{cand_w}. Est Uplift ${delta:.2f} > Gas ${self.GAS_USD*1.5:.2f}")
+                    self.logger.info(f"🎯 Amortized Tightening! {prev_width}->{cand_w}. Est Uplift ${delta:.2f} > Gas ${GAS*1.5:.2f}")
 
             # 7) REGIME-SPECIFIC HOLD LOGIC (Default)
             else:
                 should_hold = False
                 
-                if current_regime in ["low", "mid"]:
+                if current_regime in _CALM_REGIMES:
                     if prev_oor < 80: should_hold = True
                 elif current_regime == "mean_revert":
                     if prev_oor < 60 and prev_alpha > -1000: should_hold = True
-                elif current_regime in ["trend_up", "trend_down"]:
+                elif current_regime in _TREND_REGIMES:
                     if prev_alpha > 0 and prev_oor < 95: should_hold = True
                 elif current_regime == "jumpy":
                     if prev_alpha > 0 and prev_oor < 90: should_hold = True
                 
                 if should_hold:
-                    if prev_fees < self.FEE_GATE and prev_alpha > self.LOSS_BREAKER and prev_oor < oor_critical:
+                    if prev_fees < FEE_GATE and prev_alpha > LOSS and prev_oor < oor_critical:
                         action = "hold"
                         rule_fired = f"hold_regime_ev_gated"
                     else:
@@ -588,7 +733,7 @@ class Phase5LearningAgent:
                         target_width_pts = float(min_width)
                         rule_fired = "hold_blocked_width_too_narrow"
                 else:
-                    if prev_fees < self.FEE_GATE and prev_alpha > self.LOSS_BREAKER:
+                    if prev_fees < FEE_GATE and prev_alpha > LOSS:
                         action = "hold"
                         rule_fired = "hold_low_fees_ev_gate"
                     else:
@@ -606,7 +751,7 @@ class Phase5LearningAgent:
                 float(params["width_pts"]),
                 float(min_width),
                 float(prev_width) * 1.5 if prev_width else 0.0,
-                1400.0 if current_regime in ["trend_up", "trend_down", "jumpy"] else 0.0
+                1400.0 if current_regime in _FAST_MOVING_REGIMES else 0.0
             )
         
         # ✅ Add decision basis to params for comprehensive audit trail
@@ -619,11 +764,11 @@ class Phase5LearningAgent:
             "prev_action": prev_action,
             "prev_width_pts": prev_width,
             "prev_regime": prev_regime,
-            "oor_critical": OOR_CRITICAL_BY_REGIME.get(current_regime, OOR_CRITICAL_DEFAULT),
-            "fee_gate": self.FEE_GATE,
-            "gas_usd": self.GAS_USD,
-            "fee_gate_mult": self.FEE_GATE / self.GAS_USD if self.GAS_USD > 0 else 0,
-            "preempt_margin": self.PREEMPT_MARGIN,
+            "oor_critical": oor_critical,
+            "fee_gate": FEE_GATE,
+            "gas_usd": GAS,
+            "fee_gate_mult": FEE_GATE / GAS if GAS > 0 else 0,
+            "preempt_margin": PREEMPT,
             "preempt_triggered": rule_fired == "trend_preempt_widen",
             "exec_mode": self.exec_mode,
             "regime_min_width": min_width,
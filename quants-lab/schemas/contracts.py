@@ -14,6 +14,24 @@ from typing import Dict, Optional, Any, List
 from pydantic import BaseModel, Field
 import datetime
 
+__all__ = [
+    "QuoteResult",
+    "RewardBreakdown",
+    "AgentConfig",
+    "EpisodeMetadata",
+    "Proposal",
+    "EpisodeResult",
+]
+
+_now = datetime.datetime.now
+_UTC = datetime.timezone.utc
+
+
+def _utc_iso() -> str:
+    """Current UTC time as ISO-8601 with a Z suffix, always with microseconds."""
+    # Fixed timespec keeps the "+00:00" suffix at a known offset to slice off
+    return _now(_UTC).isoformat(timespec="microseconds")[:-6] + "Z"
+
 # --- Core Support Models ---
 
 class QuoteResult(BaseModel):
@@ -49,7 +67,7 @@ class EpisodeMetadata(BaseModel):
     """
     episode_id: str
     run_id: str
-    timestamp: str = Field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z"))
+    timestamp: str = Field(default_factory=_utc_iso)
 
     config_hash: str
     agent_version: str
@@ -101,7 +119,7 @@ class EpisodeResult(BaseModel):
     """
     episode_id: str
     run_id: str
-    timestamp: str = Field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z"))
+    timestamp: str = Field(default_factory=_utc_iso)
 
     status: str  # "success" | "failed" | "skipped"
     exec_mode: str = "unknown"  # "mock" | "real" | "unknown"
@@ -126,6 +144,14 @@ class EpisodeResult(BaseModel):
     position_before: Optional[Dict[str, Any]] = None
     position_after: Optional[Dict[str, Any]] = None
 
+    # ✅ DELIVERABLE B: Baseline comparisons and alpha metrics
+    baselines: Optional[Dict[str, Dict[str, Any]]] = None
+    best_baseline_name: Optional[str] = None
+    alpha_usd: Optional[float] = None
+    alpha_vs: Optional[str] = None
+    alpha_per_100k_vol: Optional[float] = None
+    alpha_per_gas_usd: Optional[float] = None
+
     error: Optional[str] = None
     errors: List[str] = Field(default_factory=list)
 
@@ -106,24 +106,14 @@ def main():
         return 1
 
 # --- Helpers ---
-import hashlib
-
 POOL_ADDR = "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
 EPISODE_DURATION_S = 21600
 LOOKBACK_DAYS = 90
 
 def _select_window_for_episode(episode_id: str, now_ts: int) -> tuple[int, int, int]:
-    # MUST mirror RealDataCLMMEnvironment._select_historical_window
-    now = (now_ts // 3600) * 3600
-    lookback_start = now - (LOOKBACK_DAYS * 86400)
-    num_windows = (LOOKBACK_DAYS * 86400) // EPISODE_DURATION_S
-
-    episode_hash = int(hashlib.sha256(episode_id.encode()).hexdigest(), 16)
-    window_index = episode_hash % num_windows
-
-    start_ts = lookback_start + (window_index * EPISODE_DURATION_S)
-    end_ts = start_ts + EPISODE_DURATION_S
-    return start_ts, end_ts, window_index
+    # Same selection as RealDataCLMMEnvironment._select_historical_window
+    from lib.real_data_clmm_env import historical_window_for
+    return historical_window_for(episode_id, now_ts // 3600, EPISODE_DURATION_S, LOOKBACK_DAYS)
 
 def _cache_file_path(cache_dir: Path, pool: str, start_ts: int, duration_s: int) -> Path:
     return cache_dir / f"{pool}_{start_ts}_{duration_s}.json"
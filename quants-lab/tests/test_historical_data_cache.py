@@ -0,0 +1,52 @@
+"""
+Test HistoricalDataCache tick windows.
+
+Acceptance criteria:
+- get_tick_window keeps returning the raw list of snapshots
+- Repeat reads of a window reuse one in-process entry
+- Column arrays are built once per entry
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.historical_data_cache import HistoricalDataCache, TickWindow
+
+POOL = "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
+
+
+def test_tick_window_entry_and_columns_are_memoized(tmp_path):
+    rows = [
+        {"tick": 200000, "fees_usdc": 1.5, "weth_usd": 2000.0},
+        {"tick": 200060, "fees_usdc": 2.5},
+    ]
+    (tmp_path / f"{POOL}_1700000000_21600.json").write_text(json.dumps({"tick_data": rows}))
+    cache = HistoricalDataCache(tmp_path)
+
+    assert cache.get_tick_window(POOL, 1700000000, 21600) == rows
+
+    window = cache.get_tick_window_data(POOL, 1700000000, 21600)
+    assert window is cache.get_tick_window_data(POOL, 1700000000, 21600)
+    assert window.cols is window.cols
+    np.testing.assert_array_equal(window.cols["tick"], [200000, 200060])
+    np.testing.assert_array_equal(window.cols["weth_usd"], [2000.0, 0.0])
+
+
+def test_missing_window_without_dune_is_empty(tmp_path):
+    cache = HistoricalDataCache(tmp_path)
+    assert cache.get_tick_window(POOL, 1700000000, 21600) == []
+    assert len(cache.get_tick_window_data(POOL, 1700000000, 21600)) == 0
+
+
+def test_fingerprint_cached_and_tracks_columns():
+    window = TickWindow([{"tick": 1, "volume_usd_two_sided": 10.0}, {"tick": 2}])
+    fp = window.fingerprint
+    assert len(fp) == 12
+    assert window.fingerprint is fp
+    assert TickWindow([{"tick": 1, "volume_usd_two_sided": 10.0}, {"tick": 3}]).fingerprint != fp
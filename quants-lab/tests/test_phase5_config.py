@@ -0,0 +1,134 @@
+"""
+Test Phase5LearningAgent start-up helpers: env/config resolution and previous-result lookup.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from phase5_learning_agent import (
+    AgentEnv,
+    parse_env,
+    _load_calibration,
+    _load_regime_mix,
+    _resolve_gating_constants,
+)
+
+CALIBRATION = {
+    "calibrated_regime_mix": {"jumpy": 1},
+    "calibrated_constants": {"GAS_USD": 5, "FEE_GATE": 9},
+}
+
+
+def test_parse_env_defaults_and_overrides(monkeypatch):
+    for name in ("RUN_ID", "EPISODE_ID", "EXEC_MODE", "HB_SEED", "LEARN_FROM_MOCK", "HB_REGIME_MIX",
+                 "DUNE_CALIBRATION_JSON", "PREEMPT_MARGIN", "GAS_USD", "FEE_GATE_USD", "FEE_GATE_MULT"):
+        monkeypatch.delenv(name, raising=False)
+    assert parse_env() == AgentEnv()
+
+    monkeypatch.setenv("HB_SEED", "7")
+    monkeypatch.setenv("FEE_GATE_USD", "")
+    monkeypatch.setenv("LEARN_FROM_MOCK", "TRUE")
+    env = parse_env()
+    assert env.seed == 7
+    assert env.fee_gate_usd is None
+    assert env.learn_from_mock
+
+
+def test_calibration_shared_by_mix_and_gating(tmp_path):
+    cal_path = tmp_path / "calibration.json"
+    cal_path.write_text(json.dumps(CALIBRATION))
+    env = AgentEnv(exec_mode="paper", calibration_path=str(cal_path))
+
+    calibration = _load_calibration(env.calibration_path)
+
+    assert _load_regime_mix(env, calibration) == ({"jumpy": 1.0}, "calibration_json")
+    assert _resolve_gating_constants(env, calibration) == (5.0, 9.0, -1000.0, 3.0)
+    assert _load_calibration(str(tmp_path / "missing.json")) is None
+
+
+def test_mock_gating_uses_env_values():
+    assert _resolve_gating_constants(AgentEnv(gas_usd=3.0, fee_gate_mult=1.5))[:2] == (3.0, 4.5)
+    assert _resolve_gating_constants(AgentEnv(fee_gate_usd=7.0))[:2] == (2.0, 7.0)
+
+
+def test_malformed_regime_mix_fails_fast():
+    with pytest.raises(ValueError, match="HB_REGIME_MIX malformed"):
+        _load_regime_mix(AgentEnv(regime_mix="jumpy"))
+
+
+def test_calibration_reparsed_only_when_file_changes(tmp_path):
+    from phase5_learning_agent import _load_calibration_cached
+
+    cal_path = tmp_path / "calibration.json"
+    cal_path.write_text(json.dumps(CALIBRATION))
+    _load_calibration_cached.cache_clear()
+
+    first = _load_calibration(str(cal_path))
+    assert _load_calibration(str(cal_path)) is first
+
+    cal_path.write_text(json.dumps({"calibrated_regime_mix": {"trend_up": 1}}))
+    assert _load_calibration(str(cal_path))["calibrated_regime_mix"] == {"trend_up": 1}
+
+
+def test_agent_config_reparsed_when_file_changes(tmp_path):
+    import os
+    from phase5_learning_agent import _CONFIG_CACHE, _load_agent_config
+
+    config_path = tmp_path / "agent_config.yml"
+    config_path.write_bytes(b"reward_weights:\n  pnl: 1.0\n")
+    config_hash, cfg = _load_agent_config(config_path)
+    assert cfg == {"reward_weights": {"pnl": 1.0}}
+    assert _load_agent_config(config_path)[1] is cfg
+
+    config_path.write_bytes(b"reward_weights:\n  pnl: 2.0\n")
+    os.utime(config_path, ns=(0, config_path.stat().st_mtime_ns + 1))
+    new_hash, cfg = _load_agent_config(config_path)
+    assert new_hash != config_hash and cfg["reward_weights"]["pnl"] == 2.0
+    assert _CONFIG_CACHE[str(config_path)][0] == config_path.stat().st_mtime_ns
+
+
+def test_prev_result_is_newest_completed_episode(tmp_path, monkeypatch):
+    import logging
+    from phase5_learning_agent import Phase5LearningAgent
+
+    monkeypatch.setenv("BASE_DIR", str(tmp_path))
+    episodes = tmp_path / "runs" / "run_x" / "episodes"
+    for idx in (2, 10, 9):
+        (episodes / f"ep_{idx}").mkdir(parents=True)
+        (episodes / f"ep_{idx}" / "result.json").write_text(json.dumps({"episode": idx}))
+    (episodes / "ep_11").mkdir()  # in flight: no result.json yet
+
+    agent = Phase5LearningAgent.__new__(Phase5LearningAgent)
+    agent.run_id = "run_x"
+    agent.logger = logging.getLogger("test")
+
+    assert agent._load_prev_result() == {"episode": 10}
+    agent.run_id = "run_missing"
+    assert agent._load_prev_result() is None
+
+
+def test_calibration_with_nan_literal_still_loads(tmp_path):
+    cal_path = tmp_path / "calibration.json"
+    cal_path.write_text('{"calibrated_regime_mix": {"jumpy": 1}, "score": NaN}')
+
+    calibration = _load_calibration(str(cal_path))
+
+    assert calibration["calibrated_regime_mix"] == {"jumpy": 1}
+
+
+def test_env_regime_mix_parsed_once_per_value():
+    from phase5_learning_agent import _parse_regime_mix
+
+    _parse_regime_mix.cache_clear()
+    env = AgentEnv(regime_mix="jumpy:0.5, trend_up:0.5")
+    first, source = _load_regime_mix(env)
+    first["jumpy"] = 0.0  # callers get their own dict
+
+    assert _load_regime_mix(env) == ({"jumpy": 0.5, "trend_up": 0.5}, "env")
+    assert _parse_regime_mix.cache_info().misses == 1
@@ -0,0 +1,198 @@
+"""
+Test pool configuration validation (real mode health gate).
+"""
+
+import sys
+from pathlib import Path
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.pool_validator import validate_pool_config, validate_pool_configs, validate_and_report
+from schemas.contracts import Proposal, EpisodeMetadata
+
+VALID_POOL = "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
+
+
+def _proposal(**overrides) -> Proposal:
+    fields = dict(
+        episode_id="ep_test",
+        generated_at="2024-01-01T00:00:00Z",
+        status="active",
+        connector_execution="uniswap_v3_clmm",
+        chain="ethereum",
+        network="mainnet",
+        pool_address=VALID_POOL,
+        params={},
+        metadata=EpisodeMetadata(
+            episode_id="ep_test",
+            run_id="run_test",
+            config_hash="test_hash",
+            agent_version="1.0",
+        ),
+    )
+    fields.update(overrides)
+    return Proposal(**fields)
+
+
+def test_mock_mode_skips_validation():
+    ok, err = validate_pool_config(_proposal(chain="nope"), "mock")
+    assert ok and err is None
+
+
+def test_valid_evm_pool_passes():
+    ok, err = validate_pool_config(_proposal(), "real")
+    assert ok, err
+
+
+def test_unknown_chain_rejected():
+    ok, err = validate_pool_config(_proposal(chain="nope"), "real")
+    assert not ok
+    assert "Unrecognized chain" in err
+
+
+def test_network_must_match_chain():
+    ok, err = validate_pool_config(_proposal(chain="arbitrum", network="sepolia"), "real")
+    assert not ok
+    assert "Invalid network 'sepolia'" in err
+
+
+def test_wrong_connector_rejected():
+    ok, err = validate_pool_config(_proposal(connector_execution="uniswap_v4_clmm"), "real")
+    assert not ok
+    assert "connector_execution" in err
+
+
+def test_evm_address_must_be_hex():
+    for bad in (
+        "88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640",
+        "0x1234",
+        "0x" + "Z" * 40,
+        "0x" + " " * 40,  # bytes.fromhex() would accept this
+        "0x" + "ab " * 13 + "a",
+    ):
+        ok, err = validate_pool_config(_proposal(pool_address=bad), "real")
+        assert not ok
+        assert "Invalid pool_address" in err
+
+
+def test_disable_flag_read_via_refresh_env(monkeypatch):
+    from lib import pool_validator
+
+    monkeypatch.setenv("DISABLE_POOL_VALIDATION", "true")
+    pool_validator.refresh_env()
+    try:
+        ok, err = validate_pool_config(_proposal(chain="nope"), "real")
+        assert ok and err is None
+    finally:
+        monkeypatch.delenv("DISABLE_POOL_VALIDATION")
+        pool_validator.refresh_env()
+
+
+def test_validate_and_report_loads_proposal_json(tmp_path):
+    proposal_path = tmp_path / "proposal.json"
+    proposal_path.write_text(_proposal().model_dump_json())
+    assert validate_and_report(str(proposal_path), "run_test", "ep_test", "real")
+
+
+def test_validate_and_report_mock_skips_proposal_load(tmp_path):
+    # Missing file would be a load failure in real mode
+    assert validate_and_report(str(tmp_path / "missing.json"), "run_test", "ep_test", "mock")
+
+
+def test_validate_and_report_writes_failure_artifacts(tmp_path, monkeypatch):
+    from lib import pool_validator
+
+    monkeypatch.setattr(pool_validator, "_DATA_DIR", str(tmp_path))
+    proposal_path = tmp_path / "proposal.json"
+    proposal_path.write_text(_proposal(chain="nope").model_dump_json())
+
+    assert not validate_and_report(str(proposal_path), "run_test", "ep_test", "real")
+
+    episode_dir = tmp_path / "runs" / "run_test" / "episodes" / "ep_test"
+    for name in ("metadata.json", "result.json", "failure.json"):
+        assert (episode_dir / name).exists()
+    assert "Unrecognized chain" in (episode_dir / "failure.json").read_text()
+
+
+def test_validation_core_is_memoized():
+    from lib import pool_validator
+
+    pool_validator._validate_pool_config_cached.cache_clear()
+    for _ in range(3):
+        assert validate_pool_config(_proposal(), "real") == (True, None)
+    info = pool_validator._validate_pool_config_cached.cache_info()
+    assert info.misses == 1 and info.hits == 2
+
+
+def test_batch_validation_writes_artifacts_only_for_failures(tmp_path, monkeypatch):
+    from lib import pool_validator
+
+    monkeypatch.setattr(pool_validator, "_DATA_DIR", str(tmp_path))
+    items = [
+        (_proposal(), "run_test", "ep_ok", "real"),
+        (_proposal(network="sepolia", chain="base"), "run_test", "ep_bad", "real"),
+    ]
+
+    assert validate_pool_configs(items) == [True, False]
+
+    episodes_dir = tmp_path / "runs" / "run_test" / "episodes"
+    assert not (episodes_dir / "ep_ok").exists()
+    assert (episodes_dir / "ep_bad" / "failure.json").exists()
+
+
+def test_solana_address_length_bounds():
+    solana = dict(chain="solana", network="mainnet-beta")
+    ok, err = validate_pool_config(_proposal(pool_address="58oQChx4yWmvKdwLLZzBi4ChoCc2fqCUWBkwMihLYQo2", **solana), "real")
+    assert ok, err
+    for bad in ("abc", "1" * 45):
+        ok, err = validate_pool_config(_proposal(pool_address=bad, **solana), "real")
+        assert not ok
+        assert "Invalid Solana pool_address length" in err
+
+
+def test_strict_validation_checks_base58_alphabet(monkeypatch):
+    from lib import pool_validator
+
+    bad = "0" * 40  # '0' is not in the base58 alphabet
+    solana = dict(chain="solana", network="mainnet-beta", pool_address=bad)
+    monkeypatch.setenv("STRICT_VALIDATION", "true")
+    pool_validator.refresh_env()
+    try:
+        ok, err = validate_pool_config(_proposal(**solana), "real")
+        assert not ok
+        assert "Invalid Solana pool_address" in err
+    finally:
+        monkeypatch.delenv("STRICT_VALIDATION")
+        pool_validator.refresh_env()
+
+
+def test_import_does_not_load_proposal_schemas():
+    import subprocess
+
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]); import lib.pool_validator; "
+        "print('schemas.contracts' in sys.modules, 'lib.artifacts' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(Path(__file__).parent.parent)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert out.split() == ["False", "False"]
+
+
+def test_failure_bundle_is_all_or_nothing(tmp_path):
+    import pytest
+    from lib.artifacts import EpisodeArtifacts
+    from lib.schemas import EpisodeResult
+
+    artifacts = EpisodeArtifacts(run_id="run_test", episode_id="ep_bad", base_dir=str(tmp_path))
+    metadata = _proposal().metadata
+    result = EpisodeResult(episode_id="ep_bad", run_id="run_test", status="failed", exec_mode="real")
+
+    with pytest.raises(TypeError):
+        artifacts.write_failure_bundle(metadata, result, error="boom", context={"bad": object()})
+    assert list(Path(artifacts.episode_dir).iterdir()) == []
+
+    artifacts.write_failure_bundle(metadata, result, error="boom", context={"stage": "validation"})
+    assert sorted(p.name for p in Path(artifacts.episode_dir).iterdir()) == ["failure.json", "metadata.json", "result.json"]
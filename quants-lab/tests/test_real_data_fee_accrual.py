@@ -0,0 +1,190 @@
+"""
+Test real-data fee accrual on a cached historical window.
+
+Acceptance criteria:
+- LP fees accrue only on snapshots where the tick is inside the band
+- fees_usd is derived per snapshot from native fees (fees_usdc + fees_weth * weth_usd)
+- Inverted weth_usd (<10) in the window fails fast
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.real_data_clmm_env import RealDataCLMMEnvironment
+from lib.schemas import Proposal, EpisodeMetadata
+from lib.run_context import RunContext
+
+POOL = "0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
+START_TS = 1_700_000_000
+DURATION_S = 21600
+
+
+def _snapshot(tick: int, fees_usdc: float, fees_weth: float, weth_usd: float) -> dict:
+    fees_usd = fees_usdc + fees_weth * weth_usd
+    return {
+        "tick": tick,
+        "fees_usdc": fees_usdc,
+        "fees_weth": fees_weth,
+        "weth_usd": weth_usd,
+        "fees_usd": fees_usd,
+        "pool_fees_usd_from_inputs": fees_usd,
+        "pool_fees_usd_two_sided": 2 * fees_usd,
+        "volume_usd": 1_000_000.0,
+        "volume_usd_two_sided": 2_000_000.0,
+    }
+
+
+def _episode_inputs(action="enter", width_pts=1000):
+    metadata = EpisodeMetadata(
+        episode_id="ep_test_0",
+        run_id="test_run_real_fees",
+        config_hash="test_hash",
+        agent_version="1.0",
+        extra={},
+    )
+    proposal = Proposal(
+        episode_id="ep_test_0",
+        generated_at="2024-01-01T00:00:00Z",
+        status="active",
+        params={
+            "action": action,
+            "width_pts": width_pts,
+            "order_size": 0.1,
+            "historical_window_start_ts": START_TS,
+        },
+        metadata=metadata,
+    )
+    ctx = RunContext(
+        run_id="test_run_real_fees",
+        episode_id="ep_test_0",
+        config_hash="test_hash",
+        agent_version="1.0",
+        exec_mode="mock",
+        seed=1,
+        started_at="2024-01-01T00:00:00Z",
+    )
+    return proposal, ctx
+
+
+def _run_episode(tmp_path, monkeypatch, tick_data, action="enter", width_pts=1000):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir(exist_ok=True)
+    (cache_dir / f"{POOL}_{START_TS}_{DURATION_S}.json").write_text(json.dumps({"tick_data": tick_data}))
+    monkeypatch.setenv("RUNS_DIR", str(tmp_path / "runs"))
+
+    env = RealDataCLMMEnvironment(cache_dir=cache_dir)
+    return env.execute_episode(*_episode_inputs(action, width_pts))
+
+
+def test_fees_accrue_only_in_range(tmp_path, monkeypatch):
+    # Band is centered on the first tick: [199500, 200500]
+    tick_data = [
+        _snapshot(200000, 100.0, 0.05, 2000.0),
+        _snapshot(200400, 50.0, 0.02, 2500.0),
+        _snapshot(210000, 999.0, 9.99, 3000.0),  # out of range
+    ]
+
+    result = _run_episode(tmp_path, monkeypatch, tick_data)
+
+    share = result.position_after["position_share"]
+    assert share > 0
+    assert result.position_after["in_range_steps"] == 2
+    assert result.fees_0 == pytest.approx(150.0 * share)
+    assert result.fees_1 == pytest.approx(0.07 * share)
+    assert result.fees_usd == pytest.approx((100.0 + 0.05 * 2000.0 + 50.0 + 0.02 * 2500.0) * share)
+    assert result.out_of_range_pct == pytest.approx(1 / 3)
+
+
+def test_inverted_weth_usd_fails_fast(tmp_path, monkeypatch):
+    tick_data = [
+        _snapshot(200000, 100.0, 0.05, 2000.0),
+        _snapshot(200100, 100.0, 0.05, 1 / 2000.0),
+    ]
+
+    with pytest.raises(ValueError, match="inverted"):
+        _run_episode(tmp_path, monkeypatch, tick_data)
+
+
+def test_inverted_weth_usd_checked_across_whole_window(tmp_path, monkeypatch):
+    # Bad price on an out-of-range snapshot (and with no position opened) still fails
+    tick_data = [
+        _snapshot(200000, 100.0, 0.05, 2000.0),
+        _snapshot(210000, 100.0, 0.05, 2000.0),
+        _snapshot(210000, 100.0, 0.05, 1 / 2000.0),
+    ]
+
+    with pytest.raises(ValueError, match="inverted .* at snapshot 2"):
+        _run_episode(tmp_path, monkeypatch, tick_data, action="hold")
+
+
+def test_tunables_read_once_until_reload_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAX_POSITION_SHARE", "0.0005")
+    env = RealDataCLMMEnvironment(cache_dir=tmp_path)
+    assert env._compute_position_share(10.0, 100) == pytest.approx(0.0005)
+
+    monkeypatch.setenv("MAX_POSITION_SHARE", "0.0001")
+    assert env._compute_position_share(10.0, 100) == pytest.approx(0.0005)
+
+    env.reload_env()
+    assert env._compute_position_share(10.0, 100) == pytest.approx(0.0001)
+
+
+def test_failed_baseline_recorded_per_policy(tmp_path, monkeypatch):
+    from lib import clmm_env
+
+    real_policy = clmm_env.run_stateful_baseline_policy
+
+    def flaky_policy(policy_name, **kwargs):
+        if policy_name == "baseline_hold":
+            raise RuntimeError("boom")
+        return real_policy(policy_name=policy_name, **kwargs)
+
+    monkeypatch.setattr(clmm_env, "run_stateful_baseline_policy", flaky_policy)
+    tick_data = [_snapshot(200000, 100.0, 0.05, 2000.0), _snapshot(200100, 50.0, 0.02, 2000.0)]
+
+    result = _run_episode(tmp_path, monkeypatch, tick_data)
+
+    assert "baseline_hold" not in result.baselines
+    assert list(result.baselines) == [name for name in clmm_env.BASELINE_POLICIES if name != "baseline_hold"]
+    assert result.position_after["baseline_errors"] == {"baseline_hold": "boom"}
+
+
+def test_fee_ratio_check_is_opt_in(tmp_path, monkeypatch, caplog):
+    # two_sided == fees_usd, so the "~2x" volume-bias check would fire
+    snap = _snapshot(200000, 100.0, 0.05, 2000.0)
+    snap["pool_fees_usd_two_sided"] = snap["fees_usd"]
+
+    _run_episode(tmp_path, monkeypatch, [snap])
+    assert "not ~2x" not in caplog.text
+
+    monkeypatch.setenv("HB_VERIFY_FEE_RATIOS", "1")
+    _run_episode(tmp_path, monkeypatch, [snap])
+    assert "not ~2x" in caplog.text
+
+
+def test_portfolio_state_cached_between_flushes(tmp_path, monkeypatch):
+    monkeypatch.setenv("HB_STATE_FLUSH_EVERY", "10")
+    tick_data = [_snapshot(200000, 100.0, 0.05, 2000.0)]
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / f"{POOL}_{START_TS}_{DURATION_S}.json").write_text(json.dumps({"tick_data": tick_data}))
+    monkeypatch.setenv("RUNS_DIR", str(tmp_path / "runs"))
+    state_file = tmp_path / "runs" / "test_run_real_fees" / "portfolio_state.json"
+
+    env = RealDataCLMMEnvironment(cache_dir=cache_dir)
+    env.execute_episode(*_episode_inputs("enter"))
+    assert not state_file.exists()
+
+    # The open position is carried in memory: holding accrues fees without re-entering
+    held = env.execute_episode(*_episode_inputs("hold"))
+    assert held.gas_cost_usd == 0.0
+    assert held.fees_usd > 0
+
+    env.flush_state("test_run_real_fees")
+    assert json.loads(state_file.read_text())["position_open"] is True
@@ -0,0 +1,79 @@
+"""
+Test CoinGecko price -> swap conversion in RealMarketDataClient.
+"""
+
+import math
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.real_market_data_client import RealMarketDataClient
+from lib.smart_cache import SmartCache
+
+START_TS = 1_700_000_000
+
+
+def _client_with_prices(monkeypatch, prices):
+    client = RealMarketDataClient()
+    monkeypatch.setattr(client, "_get", lambda endpoint, params=None: {"prices": prices})
+    return client
+
+
+def test_swaps_filtered_to_window_with_exact_sqrt_price(monkeypatch):
+    prices = [[(START_TS + 60 * i) * 1000 + 123, 2000.0 + i * 0.37] for i in range(-2, 8)]
+    client = _client_with_prices(monkeypatch, prices)
+
+    swaps = client.get_swaps_for_pair("WETH-USDC", START_TS, START_TS + 300).as_records()
+
+    expected = [(ms / 1000, p) for ms, p in prices if START_TS <= ms / 1000 <= START_TS + 300]
+    assert len(swaps) == len(expected) == 5
+    for swap, (ts, price) in zip(swaps, expected):
+        assert swap["block_time"] == datetime.fromtimestamp(ts).isoformat()
+        assert swap["amount1"] == price
+        assert swap["sqrt_price_x96"] == int(math.sqrt(price) * (2**96))
+
+
+def test_no_prices_returns_empty(monkeypatch):
+    client = _client_with_prices(monkeypatch, [])
+    swaps = client.get_swaps_for_pair("WETH-USDC", START_TS, START_TS + 300)
+    assert len(swaps) == 0 and not swaps
+    assert swaps.as_records() == []
+
+
+def test_swap_batch_is_columnar_with_record_access(monkeypatch):
+    prices = [[(START_TS + 60 * i) * 1000, 2000.0 + i] for i in range(5)]
+    client = _client_with_prices(monkeypatch, prices)
+
+    swaps = client.get_swaps_for_pair("WETH-USDC", START_TS, START_TS + 300)
+
+    assert swaps.amount1.dtype == np.float64
+    assert swaps.block_time.dtype == np.dtype("datetime64[ms]")
+    assert swaps.liquidity.tolist() == [5000000] * 5
+    # Legacy list-of-dicts access keeps working for existing callers
+    assert swaps[0] == swaps.as_records()[0]
+    assert list(swaps) == swaps.as_records()
+    assert swaps[-1]["amount1"] == 2004.0
+
+
+def test_market_chart_shared_through_cache(tmp_path):
+    prices = [[(START_TS + 60 * i) * 1000, 2000.0 + i] for i in range(10)]
+    calls = []
+
+    def fake_get(endpoint, params=None):
+        calls.append(endpoint)
+        return {"prices": prices}
+
+    client = RealMarketDataClient(cache=SmartCache(str(tmp_path / "cache.json")))
+    client._get = fake_get
+
+    first = client.get_swaps_for_pair("WETH-USDC", START_TS, START_TS + 300)
+    second = client.get_swaps_for_pair("WETH-USDC", START_TS + 120, START_TS + 540)
+
+    assert len(calls) == 1
+    assert first.amount1.tolist() == [2000.0 + i for i in range(6)]
+    assert second.amount1.tolist() == [2002.0 + i for i in range(8)]
@@ -0,0 +1,39 @@
+"""
+Test post-hoc regime labelling of real tick paths.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.real_data_clmm_env import _regime_stats, _regime_stats_numpy
+
+
+def test_regime_stats_match_numpy_reference():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        ticks = np.cumsum(rng.integers(-80, 80, size=200)).astype(np.int64)
+        end_delta, up, down, mean_step, std_step, jumps = _regime_stats(ticks)
+        ref = _regime_stats_numpy(ticks)
+        assert (end_delta, up, down, jumps) == (ref[0], ref[1], ref[2], ref[5])
+        assert np.isclose(mean_step, ref[3]) and np.isclose(std_step, ref[4])
+
+
+def test_flat_path_uses_fixed_jump_threshold():
+    ticks = np.array([100, 100, 100, 100], dtype=np.int64)
+    assert _regime_stats(ticks) == (0, 0, 0, 0.0, 0.0, 0)
+
+
+def test_batched_labels_match_single_path():
+    from lib.real_data_clmm_env import RealDataCLMMEnvironment
+
+    env = RealDataCLMMEnvironment.__new__(RealDataCLMMEnvironment)
+    rng = np.random.default_rng(11)
+    paths = [np.cumsum(rng.integers(-60, 60, size=n)).tolist() for n in (5, 40, 200, 1, 73)]
+    paths.append([0, 500, 0, 500, 0, 500, 0, 500, 0, 500, 0, 10])  # jumpy-ish
+
+    assert env._derive_regime_labels(paths) == [env._derive_regime_label(p) for p in paths]
@@ -0,0 +1,126 @@
+"""
+Test SmartCache append-only persistence and compaction.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib import smart_cache
+from lib.smart_cache import SmartCache
+
+
+def test_updates_are_appended(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = SmartCache(str(path))
+
+    cache.set("a", 1)
+    cache.flush()
+    cache.set("a", 2)
+    cache.set_many({"b": 3, "c": 4})
+    cache.flush()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert records[0]["key"] == "a" and records[0]["data"] == 1
+    assert sorted(r["key"] for r in records[1:]) == ["a", "b", "c"]
+
+    # Later records win on reload
+    reopened = SmartCache(str(path))
+    assert reopened.get("a") == 2 and reopened.get("c") == 4
+
+
+def test_flush_compacts_to_live_set(tmp_path, monkeypatch):
+    monkeypatch.setattr(smart_cache, "_MIN_COMPACT_BYTES", 0)
+    path = tmp_path / "cache.json"
+    cache = SmartCache(str(path))
+    for i in range(10):
+        cache.set("pool", {"tvl": i})
+        cache.flush()
+
+    # Compaction keeps the log within 2x the single live record
+    assert len(path.read_text().splitlines()) <= 2
+    assert not path.with_suffix(".json.tmp").exists()
+
+    cache.set("pool", {"tvl": 99})  # append handle reopened after compaction
+    cache.flush()
+    assert SmartCache(str(path)).get("pool") == {"tvl": 99}
+
+
+def test_reads_legacy_dict_file_and_torn_tail(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"old": {"ts": 1.0, "data": "x"}}, indent=2))
+
+    cache = SmartCache(str(path))
+    assert cache.get("old") == "x"
+    cache.set("new", "y")
+    cache.flush()
+
+    with open(path, "a") as f:
+        f.write('{"ts": 2.0, "key": "new", "da')  # crash mid-append
+    reopened = SmartCache(str(path))
+    assert reopened.get("old") == "x" and reopened.get("new") == "y"
+
+
+def test_concurrent_writers_persist_every_key(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = SmartCache(str(path))
+
+    def worker(n):
+        for i in range(200):
+            cache.set(f"w{n}:{i % 20}", i)
+            cache.get(f"w{n}:{i % 20}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.flush()
+
+    reopened = SmartCache(str(path))
+    for n in range(8):
+        for k in range(20):
+            assert reopened.get(f"w{n}:{k}") == 180 + k
+
+
+def test_unencodable_value_is_skipped_not_fatal(tmp_path):
+    from decimal import Decimal
+
+    path = tmp_path / "cache.json"
+    cache = SmartCache(str(path))
+    cache.set("bad", Decimal("1.5"))
+    cache.set("good", 1)
+    cache.flush()
+    assert smart_cache._writer_thread.is_alive()
+
+    cache.set("later", 2)
+    cache.flush()
+    reopened = SmartCache(str(path))
+    assert reopened.get("good") == 1 and reopened.get("later") == 2
+    assert reopened.get("bad") is None
+
+
+def test_instances_sharing_a_file_survive_each_others_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(smart_cache, "_MIN_COMPACT_BYTES", 0)
+    path = tmp_path / "cache.json"
+    a = SmartCache(str(path))
+    b = SmartCache(str(path))
+
+    b.set("b1", 1)
+    b.flush()
+    for i in range(5):
+        a.set("a", i)
+        a.flush()  # compacts: the log is replaced by a new file
+
+    b.set("b2", 2)  # B's append handle still points at the replaced file
+    b.flush()
+    a.set("a", 99)
+    a.flush()
+
+    fresh = SmartCache(str(path))
+    assert fresh.get("a") == 99
+    assert fresh.get("b1") == 1 and fresh.get("b2") == 2
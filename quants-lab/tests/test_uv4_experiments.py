@@ -0,0 +1,114 @@
+"""
+Test UV4ExperimentStore loading and filtering.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add quants-lab to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.uv4_experiments import UV4ExperimentStore
+
+
+def _write_run(root: Path, name: str, **fields) -> None:
+    record = {
+        "run_id": name,
+        "experiment_version": "v1_realtime",
+        "intel_quality": "good",
+        "metrics": {"total_pnl_usd": 10.0, "gas_cost_usd": 1.0},
+        "params": {"width_pts": 100},
+    }
+    record.update(fields)
+    (root / f"{name}.json").write_text(json.dumps(record))
+
+
+def test_to_dataframe_keeps_file_order_and_filters(tmp_path):
+    for i in range(12):
+        _write_run(tmp_path, f"run_{i:02d}")
+    _write_run(tmp_path, "run_mock", experiment_version="v0_mock")
+    _write_run(tmp_path, "run_bad_intel", intel_quality="stale")
+    (tmp_path / "run_zz_corrupt.json").write_text("{not json")
+
+    df = UV4ExperimentStore(str(tmp_path)).to_dataframe()
+
+    assert list(df["run_id"]) == [f"run_{i:02d}" for i in range(12)]
+    assert (df["reward_v1"] == 9.0).all()
+    assert (df["param_width_pts"] == 100).all()
+
+
+def test_empty_store_returns_empty_frame(tmp_path):
+    assert UV4ExperimentStore(str(tmp_path)).to_dataframe().empty
+
+
+def test_to_arrow_matches_dataframe(tmp_path):
+    pytest.importorskip("pyarrow")
+    _write_run(tmp_path, "run_a")
+    _write_run(tmp_path, "run_b", params={"width_pts": 50, "fee_tier": 500})
+
+    store = UV4ExperimentStore(str(tmp_path))
+    table = store.to_arrow()
+    df = store.to_dataframe()
+
+    assert table.column_names == list(df.columns)
+    assert table["reward_v1"].to_pylist() == df["reward_v1"].tolist()
+    assert table["param_fee_tier"].to_pylist() == [None, 500]
+
+
+def test_save_run_round_trips_numpy_values(tmp_path):
+    np = pytest.importorskip("numpy")
+    store = UV4ExperimentStore(str(tmp_path))
+    record = {
+        "run_id": "run_np",
+        "timestamp": "2024-01-01T00:00:00",
+        "metrics": {"total_pnl_usd": np.float64(1.5), "trade_count": np.int64(3)},
+        "params": {"trading_pair": "WETH-USDC"},
+        "when": Path("/tmp/x"),  # unknown types still fall back to str()
+    }
+
+    path = store.save_run(record)
+
+    assert path.name == "20240101_000000_WETH_USDC.json"
+    loaded = store.load_run(path)
+    assert loaded["metrics"] == {"total_pnl_usd": 1.5, "trade_count": 3}
+    assert loaded["when"] == "/tmp/x"
+
+
+def test_to_dataframe_column_projection(tmp_path):
+    _write_run(tmp_path, "run_a", params={"width_pts": 100, "spread_bps": 5})
+
+    store = UV4ExperimentStore(str(tmp_path))
+    df = store.to_dataframe(columns=["run_id", "reward_v1", "param_*"])
+
+    assert list(df.columns) == ["run_id", "param_width_pts", "param_spread_bps", "reward_v1"]
+    assert df["reward_v1"].tolist() == store.to_dataframe()["reward_v1"].tolist()
+
+
+def test_numeric_params_load_as_float32(tmp_path):
+    _write_run(tmp_path, "run_a", params={"width_pts": 100, "order_size": 0.1, "action": "enter", "hedge": True})
+
+    df = UV4ExperimentStore(str(tmp_path)).to_dataframe()
+
+    assert df["param_width_pts"].dtype == "float32"
+    assert df["param_order_size"].dtype == "float32"
+    assert df["param_action"].tolist() == ["enter"]
+    assert df["param_hedge"].dtype == bool
+    assert df["reward_v1"].dtype == "float64"
+
+
+def test_explicit_fields_are_not_replaced_by_fallbacks(tmp_path):
+    snapshot = {"market_regime": "jumpy", "volatility": 0.3}
+    _write_run(tmp_path, "run_a", intel_start={}, intel_snapshot=snapshot,
+               intel_end={"market_regime": "trend_up"}, regime_at_start=None, regime_at_end=None)
+    _write_run(tmp_path, "run_b", intel_snapshot=snapshot)
+
+    df = UV4ExperimentStore(str(tmp_path)).to_dataframe(intel_quality_whitelist=("all",))
+    a, b = df.to_dict("records")
+
+    assert pd.isna(a["regime_at_start"]) and pd.isna(a["regime_at_end"])
+    assert a["volatility"] == 0.0
+    assert b["regime_at_start"] == "jumpy" and b["volatility"] == 0.3